@@ -22,6 +22,7 @@ LOGGER = logging.getLogger(__file__)
 _EXT_PATH = ext_path("stmicro/")
 _MCU_PATH = _EXT_PATH / "cubemx/mcu"
 _FAMILY_FILE = None
+_DEVICE_LIST = None
 
 
 def _family_file() -> XmlReader:
@@ -63,7 +64,10 @@ def cubemx_device_list() -> list[DeviceIdentifier]:
     """
     :return: A list of all STM32 device identifiers.
     """
-    return [did_from_string(d) for d in devices_from_prefix("STM32")]
+    global _DEVICE_LIST
+    if _DEVICE_LIST is None:
+        _DEVICE_LIST = [did_from_string(d) for d in devices_from_prefix("STM32")]
+    return list(_DEVICE_LIST)
 
 
 # ============================= INDIVIDUAL DEVICE =============================
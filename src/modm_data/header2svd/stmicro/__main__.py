@@ -11,9 +11,9 @@ from multiprocessing.pool import ThreadPool
 
 import modm_data
 from modm_data.header2svd.stmicro import Header, normalize_memory_map
-from modm_data.svd import format_svd, write_svd
+from modm_data.svd import write_svd
 from modm_data.owl.stmicro import did_from_string
-from modm_data.utils import ext_path
+from modm_data.utils import ext_path, format_writes
 from anytree import RenderTree
 
 
@@ -69,9 +69,9 @@ def main():
         mmaptree.compatible = list(sorted(devices, key=lambda d: d.string))
         mmaptree = normalize_memory_map(mmaptree)
         print(RenderTree(mmaptree, maxlevel=2))
-        svd = format_svd(mmaptree)
         output_path = ext_path(f"stmicro/svd/header_{mmaptree.compatible[0].string}.svd")
-        write_svd(svd, str(output_path))
+        write_svd(mmaptree, str(output_path))
+    print(format_writes())
     return True
 
 
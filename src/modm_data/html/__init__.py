@@ -1,20 +1,24 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
-from .document import Document
+from .document import Document, arrow_schema
 from .chapter import Chapter
 from .table import Table
 from .text import Text, Heading, replace, listify
 from .list import List
+from .index import Index, Match
 
 __all__ = [
     "stmicro",
     "Document",
+    "arrow_schema",
     "Chapter",
     "Table",
     "Text",
     "Heading",
     "List",
+    "Index",
+    "Match",
     "replace",
     "listify",
 ]
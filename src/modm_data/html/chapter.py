@@ -5,40 +5,128 @@ import re
 import logging
 from pathlib import Path
 from functools import cached_property
-from .parser import Parser
+from lxml import etree
+from .parser import Parser, FastParser, PARSER_VERSION
 from .table import Table
 from .text import Heading, Text
+from .offsets import load_offsets, parse_table
+from ..utils import cache_path, load_pickle, store_pickle, compression_of, read_compressed, uncompressed_path
+from ..utils.compression import COMPRESSIONS
 
 LOGGER = logging.getLogger(__name__)
 
+_CACHE_PATH = cache_path("html-chapters")
+
+
+def chapter_paths(folder: Path, pattern: str = "*") -> list[Path]:
+    """
+    :param folder: folder containing the chapter files.
+    :param pattern: glob pattern of the chapter names without suffix.
+    :return: the sorted paths of all plain and compressed chapter files.
+    """
+    suffixes = [".html"] + [f".html{suffix}" for suffix in COMPRESSIONS.values()]
+    return sorted(path for suffix in suffixes for path in Path(folder).glob(f"{pattern}{suffix}"))
+
 
 class Chapter:
+    fast_parser: bool = True
+    """Parse with the lxml-based `FastParser` instead of the pure-Python `Parser`."""
+    use_cache: bool = True
+    """Load and store the parsed items in a persistent cache in `ext/cache`."""
+    use_offsets: bool = True
+    """Only parse the requested tables using the sidecar index written by `modm_data.pdf2html`."""
+
     def __init__(self, path: str):
         self._path = Path(path)
+        self._fragments = {}
 
     @cached_property
     def _parser(self):
+        if self.fast_parser:
+            parser = FastParser()
+            try:
+                parser.feed(read_compressed(self._path))
+                return parser
+            except etree.XMLSyntaxError as error:
+                LOGGER.warning(f"Falling back to the pure-Python parser for '{self._path}': {error}")
         parser = Parser()
-        parser.feed(self._path.read_text())
+        parser.feed(read_compressed(self._path).decode("utf-8"))
         return parser
 
+    @property
+    def _stem(self) -> str:
+        # Without the compression suffix
+        return uncompressed_path(self._path).stem
+
+    @property
+    def _cache_file(self) -> Path:
+        return _CACHE_PATH / self._path.parent.name / f"{self._stem}.pickle"
+
+    @cached_property
+    def _cache_key(self) -> tuple:
+        stat = self._path.stat()
+        return (str(self._path.absolute()), stat.st_size, stat.st_mtime_ns, PARSER_VERSION)
+
+    @cached_property
+    def _items(self) -> list:
+        if self.use_cache and (items := load_pickle(self._cache_file, self._cache_key)) is not None:
+            return items
+        items = self._parser._items
+        if self.use_cache:
+            store_pickle(self._cache_file, self._cache_key, items)
+        return items
+
+    @cached_property
+    def _offsets(self) -> dict | None:
+        if self.use_offsets:
+            return load_offsets(self._path)
+        return None
+
+    @property
+    def _lazy(self) -> bool:
+        # Once all items are parsed, the index has no advantage anymore
+        return "_items" not in self.__dict__ and self._offsets is not None
+
+    @cached_property
+    def _lazy_headings(self) -> list[Heading]:
+        return [Heading(html) for html in self._offsets["headings"]]
+
+    @cached_property
+    def _lazy_captions(self) -> list[Text]:
+        return [Text(entry["caption"]) for entry in self._offsets["tables"]]
+
+    @cached_property
+    def _decompressed(self) -> bytes | None:
+        # Compressed files are decompressed once for all lazily parsed tables
+        return read_compressed(self._path) if compression_of(self._path) else None
+
+    def _lazy_table(self, position: int) -> Table:
+        if (table := self._fragments.get(position)) is None:
+            entry = self._offsets["tables"][position]
+            table = self._fragments[position] = parse_table(self._path, entry["span"], self._decompressed)
+            if entry["heading"] is not None:
+                table._heading = self._lazy_headings[entry["heading"]]
+        return table
+
     @property
     def _relpath(self) -> str:
         return self._path.relative_to(Path().cwd())
 
     @property
     def name(self) -> str:
-        return self._path.stem.replace("_", " ")
+        return self._stem.replace("_", " ")
 
     @property
     def number(self) -> int:
-        return int(self._path.stem.split("_")[1])
+        return int(self._stem.split("_")[1])
 
     @property
     def items(self) -> list:
-        return self._parser._items
+        return self._items
 
     def headings(self) -> list[str]:
+        if self._lazy:
+            return list(self._lazy_headings)
         return [h for h in self.items if isinstance(h, Heading)]
 
     def texts(self) -> list[str]:
@@ -71,6 +159,12 @@ class Chapter:
         return self._heading_objects(Table, pattern, **subs)
 
     def tables(self, pattern: str = None, **subs) -> list[Table]:
+        if self._lazy:
+            return [
+                self._lazy_table(position)
+                for position, caption in enumerate(self._lazy_captions)
+                if pattern is None or re.search(pattern, caption.text(**subs), re.IGNORECASE)
+            ]
         tables = [t for t in self.items if isinstance(t, Table)]
         if pattern is None:
             return tables
@@ -86,10 +180,10 @@ class Chapter:
         return tables[0]
 
     def __hash__(self) -> int:
-        return hash(self._path.stem)
+        return hash(self._stem)
 
     def __eq__(self) -> int:
-        return hash(self._path.stem)
+        return hash(self._stem)
 
     def __repr__(self) -> str:
         return f"Chapter({self.name})"
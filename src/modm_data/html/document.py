@@ -6,11 +6,36 @@ import os
 import logging
 from pathlib import Path
 from functools import cached_property
-from .chapter import Chapter
+from .chapter import Chapter, chapter_paths
 
 LOGGER = logging.getLogger(__name__)
 
 
+def arrow_schema():
+    """
+    :return: the `pyarrow.Schema` of `Document.to_arrow()`, which is the same
+             for all documents, so that they can be concatenated and scanned
+             as one dataset even if some of them contain no tables.
+    """
+    import pyarrow as pa
+
+    # The repetitive columns are dictionary encoded to keep the table small
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("document", text),
+            ("chapter", text),
+            ("table", pa.int32()),
+            ("heading", text),
+            ("caption", text),
+            ("row", pa.int32()),
+            ("column", pa.int32()),
+            ("domain", text),
+            ("text", pa.string()),
+        ]
+    )
+
+
 class Document:
     def __init__(self, path: str):
         self.path = Path(path)
@@ -22,8 +47,9 @@ class Document:
     @cached_property
     def _chapters(self) -> dict[str, Chapter]:
         chapters = {}
-        for path in self.path.glob("*.html"):
-            chapters[path.stem.replace("_", " ")] = Chapter(path)
+        for path in chapter_paths(self.path):
+            chapter = Chapter(path)
+            chapters[chapter.name] = chapter
         return chapters
 
     @cached_property
@@ -46,5 +72,51 @@ class Document:
         assert len(chapters) == 1
         return chapters[0]
 
+    def to_arrow(self, **subs):
+        """
+        Collects the cells of all tables in the document in long format with
+        one row per table position. The columns are `document`, `chapter`,
+        `table` (index in the chapter), `heading`, `caption`, `row`, `column`,
+        `domain` (of the column header) and `text`.
+
+        :param subs: substitutions applied to all texts.
+        :return: the cells as a `pyarrow.Table`.
+        """
+        import pyarrow as pa
+
+        columns = {name: [] for name in arrow_schema().names}
+        for chapter in sorted(self.chapters(), key=lambda c: c._stem):
+            for index, table in enumerate(chapter.tables()):
+                heading, caption = table.heading(**subs), table.caption(**subs)
+                for column, (domain, texts) in enumerate(table._column_texts(**subs).items()):
+                    for row, text in enumerate(texts):
+                        columns["chapter"].append(chapter.name)
+                        columns["table"].append(index)
+                        columns["heading"].append(heading)
+                        columns["caption"].append(caption)
+                        columns["row"].append(row)
+                        columns["column"].append(column)
+                        columns["domain"].append(domain)
+                        columns["text"].append(text)
+        columns["document"] = [self.fullname] * len(columns["text"])
+        return pa.Table.from_pydict(columns, schema=arrow_schema())
+
+    def to_parquet(self, path: Path, **subs) -> Path:
+        """
+        Writes `to_arrow()` into `{path}/{document}.parquet`, so that a
+        folder of documents can be scanned as one `pyarrow.dataset` with the
+        `arrow_schema()`.
+
+        :param path: folder of the Parquet dataset.
+        :param subs: substitutions applied to all texts.
+        :return: path of the written Parquet file.
+        """
+        import pyarrow.parquet as pq
+
+        path = Path(path) / f"{self.fullname}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(self.to_arrow(**subs), path)
+        return path
+
     def __repr__(self) -> str:
         return f"Doc({self.fullname})"
@@ -0,0 +1,242 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+import re
+import logging
+import sqlite3
+from pathlib import Path
+from functools import cache
+from dataclasses import dataclass
+from .chapter import Chapter, chapter_paths
+from .table import Table
+from .text import Heading
+from ..utils import cache_path
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    document TEXT,
+    chapter TEXT,
+    size INTEGER,
+    mtime INTEGER,
+    first INTEGER,
+    last INTEGER
+);
+CREATE TABLE IF NOT EXISTS tables (
+    file INTEGER,
+    position INTEGER,
+    item INTEGER,
+    heading TEXT,
+    caption TEXT,
+    PRIMARY KEY (file, position)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(
+    text,
+    kind UNINDEXED,
+    file UNINDEXED,
+    item UNINDEXED,
+    tbl UNINDEXED,
+    x UNINDEXED,
+    y UNINDEXED
+);
+"""
+
+
+@cache
+def _compile(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _regexp(pattern: str, value: str) -> bool:
+    return value is not None and _compile(pattern).search(value) is not None
+
+
+@dataclass
+class Match:
+    """A match in the HTML archive `Index`"""
+
+    document: str
+    """Full name of the document, e.g. `RM0090-v19`."""
+    chapter: str
+    """Name of the chapter, e.g. `chapter 3 flash`."""
+    path: Path
+    """Path of the chapter HTML file."""
+    kind: str
+    """One of `heading`, `text`, `caption`, `domain` or `cell`."""
+    text: str
+    """The matched text."""
+    item: int
+    """Index of the item in `Chapter.items`."""
+    table: int | None = None
+    """Index of the table in `Chapter.tables()`."""
+    x: int | None = None
+    """Column of the domain or cell in the table."""
+    y: int | None = None
+    """Row of the cell in the table."""
+
+
+class Index:
+    """
+    Persistent SQLite index over the chapters of an HTML archive containing
+    the headings, texts, table captions, header domains and cell texts with
+    their positions. The index is updated incrementally by only reindexing
+    new or changed chapter files.
+    """
+
+    def __init__(self, archive: Path, path: Path = None):
+        """
+        :param archive: folder containing one folder of chapters per document.
+        :param path: path of the SQLite database, defaults to `ext/cache/html-index.sqlite`.
+        """
+        self.archive = Path(archive).absolute()
+        self.path = Path(path or cache_path("html-index.sqlite"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.create_function("regexp", 2, _regexp, deterministic=True)
+        self._db.executescript(_SCHEMA)
+
+    def _insert(self, path: Path):
+        stat = path.stat()
+        chapter = Chapter(path)
+        file = self._db.execute(
+            "INSERT INTO files (path, document, chapter, size, mtime) VALUES (?, ?, ?, ?, ?)",
+            (str(path), path.parent.name, chapter.name, stat.st_size, stat.st_mtime_ns),
+        ).lastrowid
+        entries = []
+        tables = []
+        for item, obj in enumerate(chapter.items):
+            if isinstance(obj, Table):
+                position = len(tables)
+                tables.append((file, position, item, obj.heading(), obj.caption()))
+                entries.append((obj.caption(br=" "), "caption", file, item, position, None, None))
+                for domain, columns in obj._domains_x(br=" ").items():
+                    entries.append((domain, "domain", file, item, position, columns[0], None))
+                for cell in obj._cells:
+                    entries.append((cell.text(br=" "), "cell", file, item, position, cell.x, cell.y))
+            else:
+                kind = "heading" if isinstance(obj, Heading) else "text"
+                entries.append((obj.text(br=" "), kind, file, item, None, None, None))
+        self._db.executemany("INSERT INTO tables VALUES (?, ?, ?, ?, ?)", tables)
+        if entries:
+            self._db.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", entries)
+            # Entries get consecutive rowids, which are much faster to delete than by file
+            last = self._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+            self._db.execute("UPDATE files SET first = ?, last = ? WHERE id = ?", (last - len(entries) + 1, last, file))
+
+    def _delete(self, file: int):
+        self._db.execute(
+            "DELETE FROM entries WHERE rowid BETWEEN (SELECT first FROM files WHERE id = ?) AND "
+            "(SELECT last FROM files WHERE id = ?)",
+            (file, file),
+        )
+        self._db.execute("DELETE FROM tables WHERE file = ?", (file,))
+        self._db.execute("DELETE FROM files WHERE id = ?", (file,))
+
+    def update(self, document: str = "*") -> int:
+        """
+        Indexes all new and changed chapters and removes the deleted ones.
+
+        :param document: glob pattern of the document folders to update.
+        :return: the number of (re-)indexed chapters.
+        """
+        known = {
+            path: (file, size, mtime)
+            for file, path, size, mtime in self._db.execute(
+                "SELECT id, path, size, mtime FROM files WHERE document GLOB ?", (document,)
+            )
+        }
+        count = 0
+        with self._db:
+            for path in chapter_paths(self.archive, f"{document}/*"):
+                stat = path.stat()
+                if (entry := known.pop(str(path), None)) is not None:
+                    if entry[1:] == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    self._delete(entry[0])
+                LOGGER.debug(f"Indexing '{path}'")
+                self._insert(path)
+                count += 1
+            for file, *_ in known.values():
+                self._delete(file)
+        return count
+
+    def _matches(self, query: str, parameters: list) -> list[Match]:
+        return [
+            Match(document, chapter, Path(path), kind, text, item, table, x, y)
+            for document, chapter, path, kind, text, item, table, x, y in self._db.execute(query, parameters)
+        ]
+
+    def search(
+        self, query: str, kind: str = None, document: str = None, chapter: str = None, limit: int = None
+    ) -> list[Match]:
+        """
+        Searches the full-text index ordered by relevance.
+
+        :param query: FTS5 query, e.g. `"wait states" AND latency`.
+        :param kind: only return matches of this kind.
+        :param document: glob pattern of the document names.
+        :param chapter: regex pattern of the chapter names.
+        :param limit: maximum number of matches.
+        :return: the matches ordered by relevance.
+        """
+        sql = (
+            "SELECT f.document, f.chapter, f.path, e.kind, e.text, e.item, e.tbl, e.x, e.y "
+            "FROM entries e JOIN files f ON f.id = e.file WHERE entries MATCH ?"
+        )
+        parameters = [query]
+        if kind is not None:
+            sql += " AND e.kind = ?"
+            parameters.append(kind)
+        if document is not None:
+            sql += " AND f.document GLOB ?"
+            parameters.append(document)
+        if chapter is not None:
+            sql += " AND f.chapter REGEXP ?"
+            parameters.append(chapter)
+        sql += " ORDER BY rank LIMIT ?"
+        parameters.append(-1 if limit is None else limit)
+        return self._matches(sql, parameters)
+
+    def tables(self, document: str = None, chapter: str = None, caption: str = None) -> list[Match]:
+        """
+        Finds tables with the same patterns as `Document.chapters()` and
+        `Chapter.tables()`, but without parsing any chapters.
+
+        :param document: glob pattern of the document names.
+        :param chapter: regex pattern of the chapter names.
+        :param caption: regex pattern of the table captions.
+        :return: the caption matches ordered by document, chapter and position.
+        """
+        sql = (
+            "SELECT f.document, f.chapter, f.path, 'caption', t.caption, t.item, t.position, NULL, NULL "
+            "FROM tables t JOIN files f ON f.id = t.file WHERE 1"
+        )
+        parameters = []
+        if document is not None:
+            sql += " AND f.document GLOB ?"
+            parameters.append(document)
+        if chapter is not None:
+            sql += " AND f.chapter REGEXP ?"
+            parameters.append(chapter)
+        if caption is not None:
+            sql += " AND t.caption REGEXP ?"
+            parameters.append(caption)
+        sql += " ORDER BY f.document, f.path, t.position"
+        return self._matches(sql, parameters)
+
+    @staticmethod
+    def table(match: Match) -> Table:
+        """
+        :param match: a match inside a table.
+        :return: the parsed table of the match.
+        """
+        return Chapter(match.path).items[match.item]
+
+    def close(self):
+        self._db.close()
+
+    def __repr__(self) -> str:
+        return f"Index({self.archive})"
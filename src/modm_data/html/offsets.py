@@ -0,0 +1,188 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+"""
+Sidecar index of a chapter file containing the headings, the table captions
+and the byte offsets of every table, so that `Chapter.tables()` only needs to
+parse the fragments of the matching tables instead of the whole file.
+"""
+
+import os
+import re
+import json
+import mmap
+import hashlib
+import logging
+from pathlib import Path
+from contextlib import contextmanager
+from lxml import etree
+from .parser import FastParser, PARSER_VERSION
+from .table import Table
+from .text import Heading
+from ..utils import compression_of, uncompressed_path, read_compressed, write_if_changed
+
+LOGGER = logging.getLogger(__name__)
+
+# lxml escapes all angle brackets inside texts and attributes, so every
+# remaining one delimits a tag
+_TAG = re.compile(rb"<(/?)([A-Za-z][\w.:-]*)[^>]*?(/?)>")
+
+
+def offsets_path(path: Path) -> Path:
+    """
+    :param path: path of the chapter HTML file.
+    :return: path of the sidecar index next to the chapter file.
+    """
+    path = uncompressed_path(path)
+    return path.with_name(f"{path.stem}.offsets.json")
+
+
+@contextmanager
+def mapped(path: Path):
+    """Memory-maps the chapter file read-only or decompresses it."""
+    if compression_of(path):
+        yield read_compressed(path)
+        return
+    with open(path, "rb") as file:
+        # Empty files cannot be memory-mapped
+        if not os.fstat(file.fileno()).st_size:
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield data
+
+
+def _digest(data) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _table_spans(data) -> list[tuple[int, int]] | None:
+    # Byte ranges of all top-level tables or None for nested tables
+    spans = []
+    depth, start = 0, None
+    for match in _TAG.finditer(data):
+        closing, tag, empty = match.groups()
+        if tag != b"table":
+            continue
+        if empty:
+            # Empty tables are still counted by the parser
+            if depth:
+                return None
+            spans.append((match.start(), match.end()))
+        elif closing:
+            depth -= 1
+            if not depth:
+                spans.append((start, match.end()))
+        else:
+            if depth:
+                return None
+            depth += 1
+            start = match.start()
+    return spans
+
+
+class _RecordingParser(FastParser):
+    # Records which table elements end up as items
+    def __init__(self):
+        super().__init__()
+        self._element = -1
+        self.elements = []
+
+    def start(self, tag, attrib):
+        if tag == "table":
+            self._element += 1
+        super().start(tag, attrib)
+
+    def end(self, tag):
+        count = len(self._items)
+        super().end(tag)
+        if tag == "table" and len(self._items) > count:
+            self.elements.append(self._element)
+
+
+def write_offsets(path: Path) -> bool:
+    """
+    Parses the chapter file once and writes its sidecar index. Chapters that
+    are not well-formed or contain nested tables do not get an index.
+
+    :param path: path of the chapter HTML file.
+    :return: `True` if the index was written.
+    """
+    path = Path(path)
+    with mapped(path) as data:
+        parser = _RecordingParser()
+        try:
+            parser.feed(data[:])
+        except etree.XMLSyntaxError as error:
+            LOGGER.warning(f"Cannot index '{path}': {error}")
+            offsets_path(path).unlink(missing_ok=True)
+            return False
+        if (spans := _table_spans(data)) is None:
+            LOGGER.debug(f"Cannot index nested tables in '{path}'")
+            offsets_path(path).unlink(missing_ok=True)
+            return False
+        digest = _digest(data)
+    stat = path.stat()
+
+    headings = [item for item in parser._items if isinstance(item, Heading)]
+    positions = {id(heading): index for index, heading in enumerate(headings)}
+    tables = [item for item in parser._items if isinstance(item, Table)]
+    index = {
+        "version": PARSER_VERSION,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "digest": digest,
+        "headings": [heading.html for heading in headings],
+        "tables": [
+            {
+                "span": spans[element],
+                "caption": table._caption.html,
+                "heading": positions.get(id(table._heading)),
+            }
+            for element, table in zip(parser.elements, tables)
+        ],
+    }
+    write_if_changed(offsets_path(path), json.dumps(index).encode("utf-8"))
+    return True
+
+
+def load_offsets(path: Path) -> dict | None:
+    """
+    :param path: path of the chapter HTML file.
+    :return: the sidecar index or `None` if it is missing or outdated.
+    """
+    path = Path(path)
+    try:
+        index = json.loads(offsets_path(path).read_text())
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != PARSER_VERSION:
+        return None
+    # Unchanged files are not read at all, only touched files are hashed
+    stat = path.stat()
+    if (index.get("size"), index.get("mtime")) == (stat.st_size, stat.st_mtime_ns):
+        return index
+    if not compression_of(path) and index.get("size") != stat.st_size:
+        return None
+    # Patches may change the file after conversion without changing its size
+    with mapped(path) as data:
+        if index.get("digest") != _digest(data):
+            return None
+    return index
+
+
+def parse_table(path: Path, span: tuple[int, int], data: bytes = None) -> Table:
+    """
+    :param path: path of the chapter HTML file.
+    :param span: byte range of the table element.
+    :param data: the already decompressed content of a compressed file.
+    :return: the table parsed from only this fragment of the file.
+    """
+    if data is not None:
+        fragment = data[span[0] : span[1]]
+    else:
+        with mapped(path) as data:
+            fragment = data[span[0] : span[1]]
+    parser = FastParser()
+    parser.feed(fragment)
+    return parser._items[0]
@@ -1,18 +1,22 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
-import re
 import logging
 from html.parser import HTMLParser
+from lxml import etree
 from .table import Table, Cell
 from .text import Text, Heading
 
 LOGGER = logging.getLogger(__name__)
 
+PARSER_VERSION = 2
+"""Increment when the parsed items change to invalidate the chapter cache."""
 
-class Parser(HTMLParser):
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+class _ItemBuilder:
     def __init__(self):
-        super().__init__(convert_charrefs=True)
         self._items = []
         self._ignore_tags = ["span"]
         self._type = None
@@ -22,21 +26,22 @@ class Parser(HTMLParser):
         self._tx = -1
         self._table = None
         self._cell = None
-        self._data = ""
+        # Collected as a list of strings to avoid quadratic concatenation
+        self._data = []
         self._collect_data = False
 
     def _clear_data(self):
         self._collect_data = False
-        data = self._data.replace("\n", "").replace("\r", "")
+        data = "".join(self._data).replace("\n", "").replace("\r", "")
         data = data.strip()
         return data
 
-    def handle_starttag(self, tag, attrs):
+    def _start(self, tag, attrs):
         if self._collect_data and tag not in self._ignore_tags:
-            self._data += f"<{tag}>"
+            self._data.append(f"<{tag}>")
 
         if tag in ["table", "th", "tr", "td", "caption"]:
-            self._data = ""
+            self._data = []
             self._collect_data = True
             if tag == "table":
                 heading = next((i for i in reversed(self._items) if isinstance(i, Heading)), None)
@@ -48,30 +53,30 @@ class Parser(HTMLParser):
                 self._tx = -1
             if self._table and tag in ["th", "td"]:
                 self._tx += 1
-                tys = next((a[1] for a in attrs if a[0] == "rowspan"), 1)
-                txs = next((a[1] for a in attrs if a[0] == "colspan"), 1)
+                tys = attrs.get("rowspan", 1)
+                txs = attrs.get("colspan", 1)
                 self._cell = Cell(self._tx, self._ty, int(txs), int(tys), tag == "th")
 
-        elif re.match(r"h[1-6]", tag):
-            self._data = ""
+        elif tag in _HEADINGS:
+            self._data = []
             self._collect_data = True
             self._type = "h"
 
         elif self._type is None:
-            self._data = ""
+            self._data = []
             self._collect_data = True
             self._type = (tag, len(self._tags))
 
         self._tags.append(tag)
 
-    def handle_data(self, data):
+    def _text(self, data):
         if self._collect_data:
-            self._data += data
+            self._data.append(data)
 
-    def handle_endtag(self, tag):
+    def _end(self, tag):
         self._tags.pop()
 
-        if re.match(r"h[1-6]", tag):
+        if tag in _HEADINGS:
             self._items.append(Heading(self._clear_data()))
             self._type = None
 
@@ -96,4 +101,50 @@ class Parser(HTMLParser):
             self._items.append(Text(self._clear_data()))
 
         if self._collect_data and tag not in self._ignore_tags:
-            self._data += f"</{tag}>"
+            self._data.append(f"</{tag}>")
+
+
+class Parser(_ItemBuilder, HTMLParser):
+    """Pure-Python parser that accepts any HTML."""
+
+    def __init__(self):
+        _ItemBuilder.__init__(self)
+        HTMLParser.__init__(self, convert_charrefs=True)
+
+    def handle_starttag(self, tag, attrs):
+        self._start(tag, dict(reversed(attrs)))
+
+    def handle_data(self, data):
+        self._text(data)
+
+    def handle_endtag(self, tag):
+        self._end(tag)
+
+
+class FastParser(_ItemBuilder):
+    """
+    Parser using the lxml C parser for the well-formed XHTML written by
+    `modm_data.pdf2html`, producing the same items as `Parser`.
+    """
+
+    def feed(self, data: str | bytes):
+        """
+        :param data: the complete HTML document.
+        :raises lxml.etree.XMLSyntaxError: if the document is not well-formed.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        etree.fromstring(data, etree.XMLParser(target=self, resolve_entities=False, huge_tree=True))
+
+    # lxml parser target interface
+    def start(self, tag, attrib):
+        self._start(tag, attrib)
+
+    def data(self, data):
+        self._text(data)
+
+    def end(self, tag):
+        self._end(tag)
+
+    def close(self):
+        return self._items
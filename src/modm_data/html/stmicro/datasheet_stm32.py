@@ -13,10 +13,13 @@ from ..document import Document
 
 
 class DatasheetStm32(Document):
-    def __init__(self, path: str):
+    def __init__(self, path: str, devices: list[DeviceIdentifier] = None):
         super().__init__(path)
         self._id = {}
         self._devices = {}
+        if devices is not None:
+            # Known devices, e.g. from a cache, are not extracted again
+            self.devices = devices
 
     def __repr__(self) -> str:
         return f"DSstm32({self.fullname})"
@@ -219,16 +222,20 @@ class DatasheetStm32(Document):
         data_packages = defaultdict(list)
         data_pins = defaultdict(dict)
 
-        packages = set((d[0], d[1]) for d in self.packages)
+        packages = list(set((d[0], d[1]) for d in self.packages))
+        # Resolve the columns once for all rows
+        rows = self._table_pinout.view(
+            "pin +name|:name", "I ?/ ?O", "type", "remap", "additional", *(d for d, _ in packages), br="<br>"
+        )
         # Import the pin definitions incl. additional function
-        for row in self._table_pinout.cell_rows(br="<br>"):
-            pin_name = row.match_value("pin +name|:name")[0].text(**pin_replace).strip()
+        for name_cells, io_cells, type_cells, remap, additional, *positions in rows:
+            pin_name = name_cells[0].text(**pin_replace).strip()
             if not pin_name:
                 continue
-            ios = row.match_value("I ?/ ?O")[0].text(**{"-": ""})
-            ptype = row.match_value("type")[0].text()
+            ios = io_cells[0].text(**{"-": ""})
+            ptype = type_cells[0].text()
             # Hack to make fix the PD0/PD1 pins
-            if pin_name.startswith("OSC") and (remap := row.match_value("remap")):
+            if pin_name.startswith("OSC") and remap:
                 if (pin := remap[0].text()).startswith("P"):
                     pin_name = f"{pin}-{pin_name}"
 
@@ -238,11 +245,11 @@ class DatasheetStm32(Document):
             if ptype:
                 data_pin["type"] = ptype
             if ptype == "I/O" and "STM32F1" not in self.device_family:
-                signals = html_listify(row.match_value("additional")[0].text(**add_replace))
+                signals = html_listify(additional[0].text(**add_replace))
                 data_pin["additional"] = set(signals)
 
-            for domain, package_name in packages:
-                if ppos := html_listify(row[domain][0].text(**pos_replace)):
+            for (_, package_name), cells in zip(packages, positions):
+                if ppos := html_listify(cells[0].text(**pos_replace)):
                     data_packages[package_name].append((pin_name, ppos))
 
         # Import the alternate functions
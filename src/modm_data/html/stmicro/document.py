@@ -2,8 +2,11 @@
 # SPDX-License-Identifier: MPL-2.0
 
 import json
+from pathlib import Path
+from multiprocessing import Pool, current_process
 from collections import defaultdict
 from ..document import Document
+from ..chapter import chapter_paths
 from ...utils import cache_path, ext_path
 from .datasheet_stm32 import DatasheetStm32
 from .datasheet_sensor import DatasheetSensor
@@ -13,11 +16,14 @@ from ...kg.stmicro import did_from_string
 
 
 MAP_DEVICE_DOC_FILE = cache_path("stmicro-did-doc.json")
+DOC_ENTRIES_FILE = cache_path("stmicro-doc-entries.json")
 DOCUMENT_CACHE = None
 
+_DOCUMENT_CLASSES = {cls.__name__: cls for cls in (DatasheetStm32, DatasheetSensor, ReferenceManual)}
 
-def load_documents() -> list:
-    documents = defaultdict(dict)
+
+def _document_paths() -> list[Path]:
+    paths = []
     for path in sorted(ext_path("stmicro/html").glob("*-v*")):
         # This doc is parsed wrongly since it has a DRAFT background
         if "DS12960-v5" in path.stem:
@@ -25,19 +31,99 @@ def load_documents() -> list:
         # This doc has a preliminary ordering information STM32WBA52CGU6TR
         if "DS14127" in path.stem:
             continue
-        doc = Document(path)
-        if "DS" in doc.name and (chap := doc.chapters("chapter 0")):
-            # FIXME: Better detection that DS13252 is a STM32WB55 module, not a chip!
-            if (
-                any("STM32" in h.html for h in chap[0].headings())
-                and "DS13252" not in doc.name
-                and "DS14096" not in doc.name
-            ):
-                documents[doc.name][doc.version] = DatasheetStm32(path)
-            else:
-                documents[doc.name][doc.version] = DatasheetSensor(path)
-        elif "RM" in doc.name:
-            documents[doc.name][doc.version] = ReferenceManual(path)
+        paths.append(path)
+    return paths
+
+
+def _document_stamp(path: Path) -> list[int]:
+    # The chapters are rewritten on conversion, so their mtimes identify the version
+    mtimes = [chapter.stat().st_mtime_ns for chapter in chapter_paths(path)]
+    return [len(mtimes), max(mtimes, default=0)]
+
+
+def _document_class(path: Path):
+    doc = Document(path)
+    if "DS" in doc.name and (chap := doc.chapters("chapter 0")):
+        # FIXME: Better detection that DS13252 is a STM32WB55 module, not a chip!
+        if (
+            any("STM32" in h.html for h in chap[0].headings())
+            and "DS13252" not in doc.name
+            and "DS14096" not in doc.name
+        ):
+            return DatasheetStm32
+        return DatasheetSensor
+    elif "RM" in doc.name:
+        return ReferenceManual
+    return None
+
+
+def _scan_class(path: Path) -> dict:
+    cls = _document_class(path)
+    return {"stamp": _document_stamp(path), "class": cls.__name__ if cls is not None else None}
+
+
+def _scan_devices(path: Path, cls_name: str) -> list[str]:
+    doc = _DOCUMENT_CLASSES[cls_name](path)
+    return [getattr(did, "string", did) for did in doc.devices]
+
+
+def _pool_map(function, arguments: list) -> list:
+    # Daemonic pool workers are not allowed to create their own pool
+    if len(arguments) <= 1 or current_process().daemon:
+        return [function(*args) for args in arguments]
+    with Pool() as pool:
+        return pool.starmap(function, arguments)
+
+
+def _document_entries(use_cached=True, devices=False) -> tuple[dict[str, dict], dict[str, Path]]:
+    # Every document has a cache entry with its class and possibly its devices,
+    # so that only new or changed documents need to be scanned again
+    cache = {}
+    if use_cached and DOC_ENTRIES_FILE.exists():
+        with DOC_ENTRIES_FILE.open("r", encoding="utf-8") as fh:
+            cache = json.load(fh)
+
+    paths = _document_paths()
+    entries = {}
+    for path in paths:
+        if (entry := cache.get(str(path))) is not None and entry["stamp"] == _document_stamp(path):
+            entries[str(path)] = entry
+    stale = [(path,) for path in paths if str(path) not in entries]
+    for (path,), entry in zip(stale, _pool_map(_scan_class, stale)):
+        entries[str(path)] = entry
+    changed = bool(stale) or len(entries) != len(cache)
+
+    # Always choose the latest version
+    latest = {}
+    for path in paths:
+        if entries[str(path)]["class"] is not None:
+            latest[path.stem.split("-")[0]] = path
+
+    if devices:
+        missing = [
+            (path, entries[str(path)]["class"])
+            for path in latest.values()
+            if entries[str(path)]["class"] != "DatasheetSensor" and "devices" not in entries[str(path)]
+        ]
+        for (path, _), devs in zip(missing, _pool_map(_scan_devices, missing)):
+            entries[str(path)]["devices"] = devs
+        changed |= bool(missing)
+
+    if changed:
+        DOC_ENTRIES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with DOC_ENTRIES_FILE.open("w", encoding="utf-8") as fh:
+            json.dump(entries, fh, indent=4)
+
+    return entries, latest
+
+
+def load_documents() -> list:
+    documents = defaultdict(dict)
+    entries, _ = _document_entries()
+    for path in _document_paths():
+        if (cls := entries[str(path)]["class"]) is not None:
+            doc = _DOCUMENT_CLASSES[cls](path)
+            documents[doc.name][doc.version] = doc
     return documents
 
 
@@ -49,10 +135,17 @@ def load_document_devices(
         return DOCUMENT_CACHE
 
     global MAP_DEVICE_DOC_FILE
+    entries, latest = _document_entries(use_cached, devices=True)
+    # The map is only valid for the exact set of documents it was built from
+    stamps = {str(path): entries[str(path)]["stamp"] for path in latest.values()}
+    json_data = None
     if MAP_DEVICE_DOC_FILE.exists() and use_cached:
         with MAP_DEVICE_DOC_FILE.open("r", encoding="utf-8") as fh:
             json_data = json.load(fh)
+        if json_data.get("documents") != stamps:
+            json_data = None
 
+    if json_data is not None:
         docs = {}
         for path in set(json_data["ds"].values()):
             docs[path] = DatasheetStm32(path)
@@ -63,11 +156,15 @@ def load_document_devices(
     else:
         dss = defaultdict(set)
         rms = defaultdict(set)
-        for name, versions in load_documents().items():
-            # Always choose the latest version
-            doc = list(versions.values())[-1]
-            # print(doc.path_pdf.relative_to(Path().cwd()), doc.path.relative_to(Path().cwd()))
-            # print(doc.devices)
+        for path in latest.values():
+            entry = entries[str(path)]
+            # Reuse the cached devices instead of parsing the document again
+            if entry["class"] == DatasheetStm32.__name__:
+                doc = DatasheetStm32(path, [did_from_string(did) for did in entry["devices"]])
+            elif entry["class"] == ReferenceManual.__name__:
+                doc = ReferenceManual(path, entry["devices"])
+            else:
+                doc = _DOCUMENT_CLASSES[entry["class"]](path)
             if isinstance(doc, DatasheetStm32):
                 if not doc.devices:
                     raise ValueError(f"{doc} has no associated devices!")
@@ -100,6 +197,7 @@ def load_document_devices(
 
         # Cache the results for the next call
         json_data = {
+            "documents": stamps,
             "ds": {did.string: str(doc.path) for did, doc in datasheets.items()},
             "rm": {did.string: str(doc.path) for did, doc in reference_manuals.items()},
         }
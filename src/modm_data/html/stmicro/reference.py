@@ -2,16 +2,25 @@
 # SPDX-License-Identifier: MPL-2.0
 
 import re
-from functools import cached_property, cache
+from functools import cached_property
 from collections import defaultdict
 import modm_data.html as html
 from .helper import device_filter_from
 from ..document import Document
+from ..chapter import chapter_paths
+from ...utils import cache_path, load_pickle, store_pickle
+
+_CACHE_VERSION = 1
+"""Increment when the derived data changes to invalidate the cache."""
 
 
 class ReferenceManual(Document):
-    def __init__(self, path: str):
+    def __init__(self, path: str, devices: list[str] = None):
         super().__init__(path)
+        self._peripheral_maps = {}
+        if devices is not None:
+            # Known devices, e.g. from a cache, are not extracted again
+            self.devices = devices
 
     def __repr__(self) -> str:
         return f"RM({self.fullname})"
@@ -132,8 +141,24 @@ class ReferenceManual(Document):
         assert ws_tables
         return ws_tables
 
+    @cached_property
+    def _cache_key(self) -> tuple:
+        chapters = ((p.name, p.stat().st_size, p.stat().st_mtime_ns) for p in chapter_paths(self.path))
+        return (_CACHE_VERSION, tuple(chapters))
+
+    def _cached(self, name: str, compute):
+        # Derived data is cached per document version and invalidated by any chapter change
+        path = cache_path("stmicro-rm") / self.fullname / f"{name}.pickle"
+        if (value := load_pickle(path, self._cache_key)) is None:
+            value = compute()
+            store_pickle(path, self._cache_key, value)
+        return value
+
     @cached_property
     def vector_tables(self):
+        return self._cached("vector_tables", self._compute_vector_tables)
+
+    def _compute_vector_tables(self):
         name_replace = {
             "p": r"\1,",
             r" +": "",
@@ -180,8 +205,14 @@ class ReferenceManual(Document):
 
         return vtables
 
-    @cache
     def peripheral_maps(self, chapter, assert_table=True):
+        key = f"peripheral_maps_{chapter._path.stem}_{int(assert_table)}"
+        if (maps := self._peripheral_maps.get(key)) is None:
+            maps = self._cached(key, lambda: self._compute_peripheral_maps(chapter, assert_table))
+            self._peripheral_maps[key] = maps
+        return maps
+
+    def _compute_peripheral_maps(self, chapter, assert_table):
         off_replace = {r" +": "", "0x000x00": "0x00", "to": "-", "×": "*", r"\(\d+\)": ""}
         dom_replace = {r"Register +size": "Bit position"}  # noqa: F841
         reg_replace = {
@@ -267,6 +298,9 @@ class ReferenceManual(Document):
 
     @cached_property
     def peripherals(self):
+        return self._cached("peripherals", self._compute_peripherals)
+
+    def _compute_peripherals(self):
         per_replace = {
             r" +": "",
             r".*?\(([A-Z]+|DMA2D)\).*?": r"\1",
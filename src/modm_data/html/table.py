@@ -2,6 +2,8 @@
 # SPDX-License-Identifier: MPL-2.0
 
 import re
+from typing import Iterator
+from functools import cached_property
 from collections import defaultdict
 from .text import ReDict, Text, Heading
 
@@ -60,12 +62,13 @@ class Domains:
     def cells(self, pattern_x: str, pattern_y: str = None, **subs) -> list[Cell]:
         domains_y = self.domains_y(pattern_y, **subs)
         domains_x = self._table.domains_x(pattern_x, **subs)
+        columns = self._table._domains_x(**subs)
+        rows = self._table._domains_y(self._columns, **subs)
         cells = defaultdict(lambda: defaultdict(set))
         for dom_y in domains_y:
             for dom_x in domains_x:
-                for x in self._table._domains_x(**subs)[dom_x]:
-                    for y in self._table._domains_y(self._columns, **subs)[dom_y]:
-                        # print(x, y, dom_x, dom_y)
+                for x in columns[dom_x]:
+                    for y in rows[dom_y]:
                         cells[dom_y][dom_x].add(self._table.cell(x, y))
 
         return ReDict({k: ReDict({vk: list(vv) for vk, vv in v.items()}) for k, v in cells.items()})
@@ -74,6 +77,76 @@ class Domains:
         return f"Domains({self.domains_x()}, {self.domains_y()})"
 
 
+class _DomainIndex:
+    # The domains of a table for one set of text substitutions
+    def __init__(self, table, subs: dict):
+        self._table = table
+        self._subs = subs
+        self._rows = {}
+
+    @cached_property
+    def columns(self) -> dict[str, list[int]]:
+        table = self._table
+        domains = defaultdict(list)
+        for x in range(table.columns):
+            cell = None
+            domain = []
+            for y in range(table._hrows):
+                if (ncell := table.cell(x, y)) != cell:
+                    cell = ncell
+                    domain.append(cell)
+            domain = ":".join(cell.text(**self._subs).replace(":", "") for cell in domain)
+            domains[domain].append(x)
+        return dict(domains)
+
+    @cached_property
+    def sorted_columns(self) -> list[str]:
+        return sorted(self.columns.keys())
+
+    @cached_property
+    def column_names(self) -> list[str]:
+        # Columns can share a domain, so number the repeated ones, skipping
+        # numbers that would collide with other domains, e.g. `X.1`
+        names = [None] * self._table.columns
+        used = set(self.columns)
+        for domain, cols in self.columns.items():
+            names[cols[0]] = domain
+            number = 0
+            for x in cols[1:]:
+                number += 1
+                while f"{domain}.{number}" in used:
+                    number += 1
+                names[x] = f"{domain}.{number}"
+                used.add(names[x])
+        return names
+
+    def rows(self, columns: tuple[int]) -> dict[str, list[int]]:
+        if (domains := self._rows.get(columns)) is not None:
+            return domains
+        table = self._table
+        domains = defaultdict(list)
+        for y in range(table._hrows, table.rows):
+            cell = None
+            cells = []
+            for x in columns:
+                if (ncell := table.cell(x, y)) != cell:
+                    cell = ncell
+                    cells.append(cell)
+            if cells:
+                domain = ":".join(cell.text(**self._subs).replace(":", "") for cell in cells)
+                domains[domain].append(y)
+        domains = self._rows[columns] = dict(domains)
+        return domains
+
+    @cached_property
+    def cell_rows(self) -> list[dict[str, list[Cell]]]:
+        table = self._table
+        return [
+            {domain: [table.cell(x, y) for x in cols] for domain, cols in self.columns.items()}
+            for y in range(table._hrows, table.rows)
+        ]
+
+
 class Table:
     def __init__(self, heading=None):
         self._heading = heading or Heading("")
@@ -82,6 +155,7 @@ class Table:
         self._grid = None
         self._hrows = 0
         self._caption = Text("")
+        self._indices = {}
 
     def __repr__(self) -> str:
         return f"Table({self.columns}×{self.rows})"
@@ -92,38 +166,28 @@ class Table:
     def caption(self, **filters):
         return self._caption.text(**filters)
 
+    def _index(self, subs: dict) -> _DomainIndex:
+        signature = tuple(subs.items())
+        try:
+            if (index := self._indices.get(signature)) is None:
+                index = self._indices[signature] = _DomainIndex(self, subs)
+        except TypeError:
+            # Unhashable substitutions cannot be cached
+            index = _DomainIndex(self, subs)
+        return index
+
     def _domains_x(self, **subs) -> dict[str, list[int]]:
-        domains = defaultdict(list)
-        for x in range(self.columns):
-            cell = None
-            domain = []
-            for y in range(self._hrows):
-                if (ncell := self.cell(x, y)) != cell:
-                    cell = ncell
-                    domain.append(cell)
-            domain = ":".join(cell.text(**subs).replace(":", "") for cell in domain)
-            domains[domain].append(x)
-        return dict(domains)
+        # Copies, so that callers cannot modify the cached index
+        return {domain: list(cols) for domain, cols in self._index(subs).columns.items()}
 
     def _domains_y(self, columns: list[int], **subs) -> dict[str, list[int]]:
-        domains = defaultdict(list)
-        for y in range(self._hrows, self.rows):
-            cell = None
-            cells = []
-            for x in columns:
-                if (ncell := self.cell(x, y)) != cell:
-                    cell = ncell
-                    cells.append(cell)
-            if cells:
-                domain = ":".join(cell.text(**subs).replace(":", "") for cell in cells)
-                domains[domain].append(y)
-        return dict(domains)
+        return {domain: list(rows) for domain, rows in self._index(subs).rows(tuple(columns)).items()}
 
     def domains_x(self, pattern=None, **subs) -> list[str]:
-        domains = sorted(self._domains_x(**subs).keys())
+        domains = self._index(subs).sorted_columns
         if pattern is not None:
-            domains = [d for d in domains if re.search(pattern, d, re.IGNORECASE)]
-        return domains
+            return [d for d in domains if re.search(pattern, d, re.IGNORECASE)]
+        return list(domains)
 
     def domains(self, pattern: str, **subs) -> Domains:
         domains = []
@@ -135,15 +199,65 @@ class Table:
         return Domains(self, domains, columns, pattern)
 
     def cell_rows(self, pattern: str = None, **subs) -> dict[str, list[Cell]]:
-        columns = []
-        for domain, cols in self._domains_x(**subs).items():
-            if pattern is None or re.search(pattern, domain, re.IGNORECASE):
-                columns.append((domain, cols))
-        for y in range(self._hrows, self.rows):
-            values = defaultdict(list)
-            for domain, cols in columns:
-                values[domain].extend(self.cell(c, y) for c in cols)
-            yield ReDict(values)
+        index = self._index(subs)
+        domains = [d for d in index.columns if pattern is None or re.search(pattern, d, re.IGNORECASE)]
+        for row in index.cell_rows:
+            yield ReDict({domain: list(row[domain]) for domain in domains})
+
+    def view(self, *columns: str, **subs) -> Iterator[tuple[list[Cell] | None, ...]]:
+        """
+        Resolves the columns against the header domains once for the whole
+        table instead of once per row as with `cell_rows()`. A column is
+        either an exact domain or a pattern matched like `ReDict.match_value()`.
+
+        :param columns: domains or patterns of the columns.
+        :param subs: substitutions applied to the header domains.
+        :raises ValueError: if a pattern matches multiple domains.
+        :return: yields a tuple for every row with the cells of each column or
+                 `None` if the column does not exist.
+        """
+        index = self._index(subs)
+        keys = ReDict.fromkeys(index.columns)
+        domains = []
+        for column in columns:
+            if column not in index.columns:
+                matches = keys.match_keys(column)
+                if len(matches) > 1:
+                    raise ValueError(f"Multiple key matches for {column}: {matches}!")
+                column = matches[0] if matches else None
+            domains.append(column)
+        for row in index.cell_rows:
+            yield tuple(row[domain] if domain is not None else None for domain in domains)
+
+    def _column_texts(self, **subs) -> dict[str, list[str]]:
+        columns = {}
+        for x, name in enumerate(self._index(subs).column_names):
+            cells = (self.cell(x, y) for y in range(self._hrows, self.rows))
+            columns[name] = [cell.text(**subs) if cell is not None else None for cell in cells]
+        return columns
+
+    def to_arrow(self, **subs):
+        """
+        Converts the table body to one string column per table column, named
+        after its header domain. Spanning cells are repeated in every position.
+
+        :param subs: substitutions applied to the header and cell texts.
+        :return: the table as a `pyarrow.Table`.
+        """
+        import pyarrow as pa
+
+        return pa.table(self._column_texts(**subs))
+
+    def to_pandas(self, **subs):
+        """
+        Converts the table body like `to_arrow()`.
+
+        :param subs: substitutions applied to the header and cell texts.
+        :return: the table as a `pandas.DataFrame`.
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self._column_texts(**subs))
 
     def cell(self, x: int, y: int) -> Cell:
         assert x < self.columns
@@ -166,6 +280,7 @@ class Table:
         xsize = sum(c._span[0] for c in self._cells if c._pos[0][1] == 0)
         ysize = max(c._pos[0][1] + c._span[1] for c in self._cells)
         self._size = (xsize, ysize)
+        self._indices = {}
         self._grid = [[None for _ in range(xsize)] for _ in range(ysize)]
 
         xpos, ypos = 0, 0
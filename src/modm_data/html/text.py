@@ -2,24 +2,50 @@
 # SPDX-License-Identifier: MPL-2.0
 
 import re
+from functools import lru_cache
 
+_TAGS = {"u", "i", "b", "p", "br", "sup", "sub"}
+_DEFAULT_SUBSTITUTIONS = {"u": "*", "i": "*", "b": "*", "sub": "*", "sup": "*", "br": "*", "p": "*"}
 
-def replace(html, **substitutions) -> str:
-    subs = {"u": "*", "i": "*", "b": "*", "sub": "*", "sup": "*", "br": "*", "p": "*"}
-    subs.update(substitutions)
+
+def _compile(signature: tuple) -> callable:
+    steps = []
+    subs = _DEFAULT_SUBSTITUTIONS | dict(signature)
     for tag, replacement in subs.items():
-        if tag in {"u", "i", "b", "p", "br", "sup", "sub"}:
+        if tag in _TAGS:
             if replacement == "*":
-                try:
-                    html = re.sub(f"</?{tag}>", "", html)
-                except:
-                    print(html)
-                    raise
+                steps.append((True, re.compile(f"</?{tag}>"), ""))
             else:
-                html = re.sub(f"<{tag}>(.*?)</{tag}>", replacement, html)
+                steps.append((True, re.compile(f"<{tag}>(.*?)</{tag}>"), replacement))
         else:
-            html = re.sub(tag, replacement, html)
-    return html
+            steps.append((False, re.compile(tag), replacement))
+
+    def substitute(html: str) -> str:
+        for is_tag, pattern, replacement in steps:
+            # Tag patterns cannot match without any tags left
+            if is_tag and "<" not in html:
+                continue
+            html = pattern.sub(replacement, html)
+        return html
+
+    return substitute
+
+
+_compile_cached = lru_cache(maxsize=256)(_compile)
+
+
+@lru_cache(maxsize=2**16)
+def _replace(html: str, signature: tuple) -> str:
+    return _compile_cached(signature)(html)
+
+
+def replace(html, **substitutions) -> str:
+    signature = tuple(substitutions.items())
+    try:
+        return _replace(html, signature)
+    except TypeError:
+        # Unhashable replacements cannot be cached
+        return _compile(signature)(html)
 
 
 def listify(text, pattern=None, strip=True) -> list[str]:
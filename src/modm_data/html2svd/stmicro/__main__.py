@@ -1,62 +1,118 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
+import time
 import tqdm
+import logging
 import argparse
-import subprocess
+import traceback
+import contextlib
+import multiprocessing
 from pathlib import Path
-from multiprocessing.pool import ThreadPool
+from collections import Counter
 
 from modm_data.html.stmicro import ReferenceManual, DatasheetSensor, load_documents
 from modm_data.html2svd.stmicro import memory_map_from_reference_manual, memory_map_from_datasheet
-from modm_data.svd import format_svd, write_svd
-from modm_data.utils import ext_path
+from modm_data.svd import write_svd
+from modm_data.cubemx import cubemx_device_list
+from modm_data.utils import ext_path, format_writes, WRITES
 from anytree import RenderTree
 
+_LOG_PATH = Path("log/stmicro/svd")
+# Inherited by the forked workers instead of being recomputed by each of them
+_DOCUMENTS = []
+
+
+def _convert(doc) -> bool:
+    print(doc.path_pdf.relative_to(Path().cwd()), doc.path.relative_to(Path().cwd()))
+    if isinstance(doc, ReferenceManual):
+        mmaptrees = memory_map_from_reference_manual(doc)
+    else:
+        mmaptrees = memory_map_from_datasheet(doc)
+    for mmaptree in mmaptrees:
+        print(RenderTree(mmaptree, maxlevel=2))
+        output_path = ext_path(f"stmicro/svd/html_{doc.name.lower()}_{mmaptree.name}.svd")
+        write_svd(mmaptree, str(output_path))
+    return True
+
+
+def _run_job(index: int) -> dict:
+    # Each job logs into its own file like the previous subprocess calls
+    doc = _DOCUMENTS[index]
+    log = _LOG_PATH / f"html_{doc.name}.txt"
+    writes = WRITES.copy()
+    start = time.perf_counter()
+    success, error = False, None
+    with open(log, "w") as logfile, contextlib.redirect_stdout(logfile), contextlib.redirect_stderr(logfile):
+        handler = logging.StreamHandler(logfile)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+        logging.getLogger().addHandler(handler)
+        try:
+            success = _convert(doc)
+        except Exception:
+            error = traceback.format_exc()
+            print(error)
+        finally:
+            logging.getLogger().removeHandler(handler)
+        print(format_writes(WRITES - writes))
+    return {
+        "name": doc.name,
+        "log": str(log),
+        "success": success,
+        "error": error.strip().splitlines()[-1] if error else None,
+        "seconds": time.perf_counter() - start,
+        "writes": WRITES - writes,
+    }
+
+
+def _convert_all(jobs: int = None) -> bool:
+    for name, versions in load_documents().items():
+        # always use latest version for now
+        doc = list(versions.values())[-1]
+        if isinstance(doc, ReferenceManual):
+            _DOCUMENTS.append(doc)
+    # Computed once before forking
+    cubemx_device_list()
+    _LOG_PATH.mkdir(exist_ok=True, parents=True)
+
+    results = []
+    start = time.perf_counter()
+    # A fresh worker for every document releases its parsed chapters and
+    # caches like the previous subprocess per document did
+    with multiprocessing.get_context("fork").Pool(jobs, maxtasksperchild=1) as pool:
+        for result in tqdm.tqdm(pool.imap_unordered(_run_job, range(len(_DOCUMENTS))), total=len(_DOCUMENTS)):
+            results.append(result)
+
+    results.sort(key=lambda r: r["seconds"], reverse=True)
+    writes = sum((r["writes"] for r in results), Counter())
+    print(f"\n{len(results)} documents in {time.perf_counter() - start:.1f}s, {format_writes(writes)}")
+    for result in results[:10]:
+        print(f"  {result['seconds']:6.1f}s  {result['name']}")
+    if failures := [r for r in results if not r["success"]]:
+        print(f"\n{len(failures)} failed:")
+        for result in failures:
+            print(f"  {result['name']}: {result['error']} ({result['log']})")
+    return not failures
+
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--stm32", type=Path)
     parser.add_argument("--sensor", type=Path)
     parser.add_argument("--all", action="store_true", default=False)
+    parser.add_argument("--jobs", type=int, help="Number of worker processes, defaults to the CPU count.")
     args = parser.parse_args()
 
     if args.all:
-        docs = []
-        for name, versions in load_documents().items():
-            # always use latest version for now
-            doc = list(versions.values())[-1]
-            if isinstance(doc, ReferenceManual):
-                docs.append(doc)
-
-        Path("log/stmicro/svd").mkdir(exist_ok=True, parents=True)
-        calls = [
-            f"python3 -m modm_data.html2svd.stmicro --stm32 {doc.path} > log/stmicro/svd/html_{doc.name}.txt 2>&1"
-            for doc in docs
-        ]
-        with ThreadPool() as pool:
-            retvals = list(tqdm.tqdm(pool.imap(lambda c: subprocess.run(c, shell=True), calls), total=len(calls)))
-        for retval, call in zip(retvals, calls):
-            if retval.returncode != 0:
-                print(call)
-        return all(r.returncode == 0 for r in retvals)
+        return _convert_all(args.jobs)
 
     if args.stm32:
         doc = ReferenceManual(args.stm32.absolute())
     elif args.sensor:
         doc = DatasheetSensor(args.sensor.absolute())
-    print(doc.path_pdf.relative_to(Path().cwd()), doc.path.relative_to(Path().cwd()))
-
-    if args.stm32:
-        mmaptrees = memory_map_from_reference_manual(doc)
-    elif args.sensor:
-        mmaptrees = memory_map_from_datasheet(doc)
-    for mmaptree in mmaptrees:
-        print(RenderTree(mmaptree, maxlevel=2))
-        svd = format_svd(mmaptree)
-        output_path = ext_path(f"stmicro/svd/html_{doc.name.lower()}_{mmaptree.name}.svd")
-        write_svd(svd, str(output_path))
-    return True
+    success = _convert(doc)
+    print(format_writes())
+    return success
 
 
 if __name__ == "__main__":
@@ -328,14 +328,33 @@ def _normalize_instances(memtree, peripherals, device):
                     BitField(tbit.name, tbit.position, tbit.width, parent=preg)
 
 
+def _device_patterns(peripherals):
+    # All device filters that are resolved while normalizing the instances
+    patterns = set()
+    for peripheral in peripherals:
+        patterns.update(peripheral.filters.get("devices", ()))
+        for ptype in peripheral.type:
+            patterns.update(ptype.filters.get("devices", ()))
+            for treg in ptype.children:
+                patterns.update(treg.filters.get("devices", ()))
+    return patterns
+
+
 def _build_device_trees(rm, peripheral_types, instance_offsets):
     devices = rm.filter_devices(cubemx_device_list())
-    memtrees = []
+    peripherals = _link_instance_to_type(rm, peripheral_types, instance_offsets)
+    patterns = _device_patterns(peripherals)
 
+    # Devices matching the same device filters have the same memory map
+    groups = defaultdict(list)
     for device in devices:
-        memtree = Device(device)
-        peripherals = _link_instance_to_type(rm, peripheral_types, instance_offsets)
-        _normalize_instances(memtree, peripherals, device)
+        signature = frozenset(p for p in patterns if re.search(p, device.string, flags=re.IGNORECASE))
+        groups[signature].append(device)
+
+    memtrees = []
+    for devices in groups.values():
+        memtree = Device(devices[0], compatible=devices)
+        _normalize_instances(memtree, peripherals, devices[0])
         memtrees.append(memtree)
     return memtrees
 
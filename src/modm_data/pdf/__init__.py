@@ -12,7 +12,7 @@ This module only contains formatting independent PDF access which is then
 specialized in the vendor-specific `modm_data.pdf2html` modules.
 """
 
-from .document import Document
+from .document import Document, map_file
 from .page import Page
 from .character import Character
 from .link import ObjLink, WebLink
@@ -24,6 +24,7 @@ from .structure import Structure
 __all__ = [
     "annotate_debug_info",
     "Document",
+    "map_file",
     "Page",
     "Character",
     "Path",
@@ -1,6 +1,8 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
+import io
+import mmap
 import ctypes
 import logging
 import pypdfium2 as pp
@@ -13,6 +15,52 @@ from .page import Page
 _LOGGER = logging.getLogger(__name__)
 
 
+def map_file(path: Path) -> mmap.mmap:
+    """
+    Maps a file copy-on-write into memory. All processes mapping the same file
+    share the physical pages of the page cache as long as they only read.
+
+    :param path: Path to the file to map.
+    :return: the writable memory map of the file.
+    """
+    with Path(path).open("rb") as file:
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+class _BufferReader(io.RawIOBase):
+    # File access for pdfium to read blocks from a read-only buffer
+    def __init__(self, view: memoryview):
+        self._view = view
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}[whence]
+        self._position = base + offset
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        block = self._view[self._position : self._position + len(buffer)]
+        buffer[: len(block)] = block
+        self._position += len(block)
+        return len(block)
+
+
+def _buffer_input(buffer):
+    if isinstance(buffer, bytes):
+        return buffer
+    view = memoryview(buffer).cast("B")
+    # Writable buffers are passed to pdfium as a pointer without copying
+    if not view.readonly:
+        return (ctypes.c_char * view.nbytes).from_buffer(view)
+    return _BufferReader(view)
+
+
 # We cannot monkey patch this class, since it's a named tuple. :-(
 class _OutlineItem(pp.PdfOutlineItem):
     def __hash__(self) -> int:
@@ -40,14 +88,18 @@ class Document(pp.PdfDocument):
     of pypdfium.
     """
 
-    def __init__(self, path: Path, autoclose: bool = False):
+    def __init__(self, path: Path, autoclose: bool = False, buffer=None):
         """
         :param path: Path to the PDF to open.
+        :param buffer: Optional buffer with the PDF data of `path` to read from
+                       instead, for example a `map_file()` memory map or the
+                       `buf` of a `multiprocessing.shared_memory.SharedMemory`.
+                       The buffer must stay open for the document lifetime.
         """
         path = Path(path)
         self.name: str = path.stem
         """Stem of the document file name"""
-        super().__init__(path, autoclose=autoclose)
+        super().__init__(path if buffer is None else _buffer_input(buffer), autoclose=autoclose)
         self._path = path
         self._bbox_cache = defaultdict(dict)
         _LOGGER.debug(f"Loading: {path}")
@@ -41,6 +41,13 @@ class Path(pp.PdfObject):
         ROUND = 1
         BEVEL = 2
 
+    class FillMode(Enum):
+        """Path Fill Mode"""
+
+        NONE = 0
+        ALTERNATE = 1
+        WINDING = 2
+
     # Overwrite the PdfPageObject.__new__ function
     def __new__(cls, *args, **kwargs):
         return object.__new__(cls)
@@ -94,6 +101,22 @@ class Path(pp.PdfObject):
         """Line join type."""
         return Path.Join(pp.raw.FPDFPageObj_GetLineJoin(self))
 
+    @cached_property
+    def _draw_mode(self) -> tuple[FillMode, bool]:
+        fillmode, stroke = ctypes.c_int(), ctypes.c_int()
+        assert pp.raw.FPDFPath_GetDrawMode(self, fillmode, stroke)
+        return Path.FillMode(fillmode.value), bool(stroke.value)
+
+    @property
+    def fill_mode(self) -> FillMode:
+        """Fill mode of the path."""
+        return self._draw_mode[0]
+
+    @property
+    def is_stroked(self) -> bool:
+        """Is the path outline stroked?"""
+        return self._draw_mode[1]
+
     @cached_property
     def bbox(self) -> Rectangle:
         """
@@ -6,7 +6,7 @@
 """
 
 from .render import annotate_debug_info
-from .convert import convert, patch
+from .convert import convert, patch, compress
 from .html import format_document, write_html
 
 __all__ = [
@@ -16,6 +16,7 @@ __all__ = [
     "format_document",
     "write_html",
     "patch",
+    "compress",
     "ast",
     "cell",
     "figure",
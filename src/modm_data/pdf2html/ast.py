@@ -6,7 +6,7 @@ import anytree
 from anytree import RenderTree, Node
 from collections import defaultdict
 from ..utils import Rectangle, ReversePreOrderIter
-from .table import VirtualTable, Cell
+from .table import VirtualTable, TableBuilder, Cell
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -287,20 +287,26 @@ def normalize_tables(document: Node) -> Node:
 
     # Merge all tables of the same number by appending at the bottom
     for number, tables in content_tables.items():
+        builder = TableBuilder(tables[0].obj)
         for table in tables[1:]:
             print(f"T{table.obj._page.number} ", end="")
-            if tables[0].obj.append_bottom(table.obj):
+            if builder.append_bottom(table.obj):
                 table.parent = None
+        builder.close()
     # Merge all register tables by appending to the right
     for tables in register_tables:
+        builder = TableBuilder(tables[0].obj)
         for table in tables[1:]:
-            if tables[0].obj.append_side(table.obj, expand=True):
+            if builder.append_side(table.obj, expand=True):
                 table.parent = None
+        builder.close()
     # Merge all bits tables by appending at the bottom
     for tables in bits_tables:
+        builder = TableBuilder(tables[0].obj)
         for table in tables[1:]:
-            if tables[0].obj.append_bottom(table.obj, merge_headers=False):
+            if builder.append_bottom(table.obj, merge_headers=False):
                 table.parent = None
+        builder.close()
 
     return document
 
@@ -49,6 +49,12 @@ class Cell:
         self.positions.sort()
         self._invalidate()
 
+    def _remap_columns(self, columns: dict[int, tuple[int, ...]]):
+        positions = [(py, nx) for (py, px) in self.positions for nx in columns.get(px, (px,))]
+        assert len(positions) == len(set(positions))
+        self.positions = sorted(positions)
+        self._invalidate()
+
     def _invalidate(self):
         for key, value in self.__class__.__dict__.items():
             if isinstance(value, cached_property):
@@ -1,17 +1,45 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
+import time
 from anytree import RenderTree
 from typing import Iterable
+from contextlib import contextmanager
 
 from .html import format_document, write_html
 from .render import annotate_debug_info
-from ..utils import pkg_apply_patch, pkg_file_exists, apply_patch
+from ..utils import pkg_apply_patch, pkg_file_exists, apply_patch, write_compressed, WRITES, format_writes
+from ..utils.compression import COMPRESSIONS
+from ..html.offsets import write_offsets
 from .ast import merge_area
 from pathlib import Path
 import pypdfium2 as pp
 
 
+@contextmanager
+def _timed(timings: dict[str, float] | None, stage: str):
+    start = time.perf_counter()
+    yield
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0) + time.perf_counter() - start
+
+
+def page_range(doc: pp.PdfDocument, pages: list[int] = None, ranges: list[str] = None) -> list[int]:
+    """
+    :param pages: 1-indexed page numbers.
+    :param ranges: 1-indexed inclusive page ranges as `start:stop` strings.
+    :return: sorted 0-indexed page numbers or all pages if neither is given.
+    """
+    if not pages and not ranges:
+        return list(range(doc.page_count))
+    numbers = [p - 1 for p in pages or []]
+    for arange in ranges or []:
+        start, stop = arange.split(":")
+        arange = range(int(start or 0), int(stop or doc.page_count - 1) + 1)
+        numbers.extend([p - 1 for p in arange])
+    return sorted(numbers)
+
+
 def convert(
     doc: pp.PdfDocument,
     page_range: Iterable[int],
@@ -24,12 +52,23 @@ def convert(
     show_ast: bool = False,
     show_tree: bool = False,
     show_tags: bool = False,
+    figures: str = None,
+    compression: str = None,
+    dictionary: Path = None,
+    timings: dict[str, float] = None,
 ) -> bool:
+    writes = WRITES.copy()
     document = None
     debug_doc = None
     debug_index = 0
-    for page in doc.pages(page_range):
-        if not render_all and not page.is_relevant:
+    pages = doc.pages(page_range)
+    while True:
+        with _timed(timings, "load"):
+            if (page := next(pages, None)) is not None:
+                is_relevant = render_all or page.is_relevant
+        if page is None:
+            break
+        if not is_relevant:
             continue
         print(f"\n\n=== {page.top} #{page.number} ===\n")
 
@@ -38,14 +77,16 @@ def convert(
                 print(struct.descr())
 
         if show_tree or render_html or show_ast:
-            areas = page.content_ast
+            with _timed(timings, "ast"):
+                areas = page.content_ast
             if show_ast:
                 print()
                 for area in areas:
                     print(RenderTree(area))
             if show_tree or render_html:
-                for area in areas:
-                    document = merge_area(document, area)
+                with _timed(timings, "merge"):
+                    for area in areas:
+                        document = merge_area(document, area)
 
         if render_pdf:
             debug_doc = annotate_debug_info(page, debug_doc, debug_index)
@@ -60,7 +101,8 @@ def convert(
             print("No pages parsed, empty document!")
             return True
 
-        document = doc._normalize(document)
+        with _timed(timings, "normalize"):
+            document = doc._normalize(document)
         if show_tree:
             print(RenderTree(document))
 
@@ -69,27 +111,64 @@ def convert(
                 for chapter in document.children:
                     if chapter.name == "chapter":
                         print(f"\nFormatting HTML for '{chapter.title}'")
-                        html = format_document(chapter)
+                        with _timed(timings, "format"):
+                            html = format_document(chapter, with_figures=figures is not None)
                         output_file = f"{output_path}/chapter_{chapter._filename}.html"
+                        if compression is not None:
+                            output_file += COMPRESSIONS[compression]
                         print(f"\nWriting HTML '{output_file}'")
-                        write_html(html, output_file, pretty=pretty)
+                        with _timed(timings, "write"):
+                            write_html(
+                                html, output_file, pretty=pretty, figure_files=figures == "files", dictionary=dictionary
+                            )
+                            write_offsets(output_file)
             else:
                 print("\nFormatting HTML")
-                html = format_document(document)
-                print(f"\nWriting HTML '{str(output_path)}'")
-                write_html(html, str(output_path), pretty=pretty)
+                with _timed(timings, "format"):
+                    html = format_document(document, with_figures=figures is not None)
+                output_file = str(output_path)
+                if compression is not None and not output_file.endswith(COMPRESSIONS[compression]):
+                    output_file += COMPRESSIONS[compression]
+                print(f"\nWriting HTML '{output_file}'")
+                with _timed(timings, "write"):
+                    write_html(html, output_file, pretty=pretty, figure_files=figures == "files", dictionary=dictionary)
+                    write_offsets(output_file)
+            print(f"\n{format_writes(WRITES - writes)}")
 
     return True
 
 
 def patch(doc, data_module, output_path: Path, patch_file: Path = None) -> bool:
+    success = True
     if patch_file is None:
         # First try the patch file for the specific version
         patch_file = f"{doc.name}.patch"
         if not pkg_file_exists(data_module, patch_file):
             # Then try the patch file shared between versions
             patch_file = f"{doc.name.split('-')[0]}.patch"
-            if not pkg_file_exists(data_module, patch_file):
-                return True
-        return pkg_apply_patch(data_module, patch_file, output_path)
-    return apply_patch(patch_file, output_path)
+        if pkg_file_exists(data_module, patch_file):
+            success = pkg_apply_patch(data_module, patch_file, output_path)
+    else:
+        success = apply_patch(patch_file, output_path)
+    # The patches move the table offsets and the chapters of the parallel
+    # conversion may have been written without index, so reindex all of them
+    for path in Path(output_path).glob("*.html"):
+        write_offsets(path)
+    return success
+
+
+def compress(output_path: Path, compression: str, dictionary: Path = None):
+    """
+    Replaces the plain chapter files with compressed ones after patching,
+    which requires the plain files.
+
+    :param output_path: folder containing the chapter files.
+    :param compression: one of `modm_data.utils.compression.COMPRESSIONS`.
+    :param dictionary: path to a zstd dictionary.
+    """
+    for path in sorted(Path(output_path).glob("*.html")):
+        cpath = path.with_name(path.name + COMPRESSIONS[compression])
+        write_compressed(cpath, path.read_bytes(), dictionary)
+        path.unlink()
+        # Stamps the index with the compressed file
+        write_offsets(cpath)
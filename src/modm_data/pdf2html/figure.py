@@ -1,7 +1,28 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
+from collections import defaultdict
+from lxml import etree
 from ..utils import Rectangle
+from ..pdf import Path
+
+_SVG_NS = "http://www.w3.org/2000/svg"
+
+
+def _svg_tag(name: str) -> str:
+    return f"{{{_SVG_NS}}}{name}"
+
+
+def _svg_color(color: int) -> tuple[str, float]:
+    # Colors are encoded as 32-bit RGBA
+    return f"#{color >> 8:06x}", (color & 0xFF) / 255
+
+
+def _svg_style(path: Path) -> tuple:
+    fill = None if path.fill_mode == Path.FillMode.NONE else path.fill
+    rule = "evenodd" if path.fill_mode == Path.FillMode.ALTERNATE else "nonzero"
+    stroke = path.stroke if path.is_stroked else None
+    return (fill, rule, stroke, round(path.width, 2) if path.is_stroked else 0)
 
 
 class Figure:
@@ -12,8 +33,81 @@ class Figure:
         self._type = "figure"
         self._paths = paths or []
 
-    def as_svg(self):
-        return None
+    def _svg_data(self, path: Path) -> str:
+        # Convert the path points into SVG coordinates relative to the top left
+        def _xy(point):
+            return f"{point.x - self.bbox.left:.2f} {self.bbox.top - point.y:.2f}"
+
+        data = []
+        beziers = []
+        for point in path.points:
+            if point.type == Path.Type.BEZIER:
+                # Bezier curves are encoded as three consecutive points
+                beziers.append(_xy(point))
+                if len(beziers) == 3:
+                    data.append("C" + " ".join(beziers))
+                    beziers = []
+            elif point.type == Path.Type.MOVE:
+                data.append("M" + _xy(point))
+            else:
+                data.append("L" + _xy(point))
+        return "".join(data)
+
+    def as_svg(self) -> etree._Element | None:
+        """
+        Converts the vector paths and text lines of the figure into SVG.
+        Paths with the same style are batched into a single SVG path element.
+
+        .. note:: Images are currently ignored.
+
+        :return: the SVG element or `None` if the figure contains no paths.
+        """
+        paths = [p for p in self._paths if isinstance(p, Path) and p.count]
+        if not paths:
+            return None
+
+        svg = etree.Element(_svg_tag("svg"), nsmap={None: _SVG_NS})
+        svg.set("width", f"{self.bbox.width:.2f}")
+        svg.set("height", f"{self.bbox.height:.2f}")
+        svg.set("viewBox", f"0 0 {self.bbox.width:.2f} {self.bbox.height:.2f}")
+
+        # Group all paths by style to emit them in batches
+        styles = defaultdict(list)
+        for path in paths:
+            styles[_svg_style(path)].append(self._svg_data(path))
+        for (fill, rule, stroke, width), datas in styles.items():
+            node = etree.SubElement(svg, _svg_tag("path"))
+            node.set("d", "".join(datas))
+            if fill is None:
+                node.set("fill", "none")
+            else:
+                color, opacity = _svg_color(fill)
+                node.set("fill", color)
+                node.set("fill-rule", rule)
+                if opacity < 1:
+                    node.set("fill-opacity", f"{opacity:.2f}")
+            if stroke is not None:
+                color, opacity = _svg_color(stroke)
+                node.set("stroke", color)
+                node.set("stroke-width", str(width))
+                if opacity < 1:
+                    node.set("stroke-opacity", f"{opacity:.2f}")
+
+        # Add the text labels inside the figure
+        for line in self._page.charlines_in_area(self.bbox):
+            if not (content := line.content.strip()):
+                continue
+            origin = next(c.origin for c in line.chars if c.char.strip())
+            x, y = origin.x - self.bbox.left, self.bbox.top - origin.y
+            node = etree.SubElement(svg, _svg_tag("text"))
+            node.set("x", f"{x:.2f}")
+            node.set("y", f"{y:.2f}")
+            node.set("font-size", f"{max(c.size for c in line.chars):.1f}")
+            if line.rotation:
+                node.set("transform", f"rotate({-90 if line.rotation == 90 else 90} {x:.2f} {y:.2f})")
+            node.text = content
+
+        return svg
 
     def __repr__(self) -> str:
         return f"Figure({int(self.bbox.width)}x{int(self.bbox.height)})"
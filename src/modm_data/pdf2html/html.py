@@ -2,15 +2,16 @@
 # SPDX-License-Identifier: MPL-2.0
 
 import logging
+from pathlib import Path
 from lxml import etree
 import anytree
-from ..utils import list_strip
+from ..utils import list_strip, uncompressed_path, write_compressed, write_if_changed
 from .ast import normalize_lines, normalize_lists, normalize_paragraphs
 
 _LOGGER = logging.getLogger(__name__)
 
 
-def _format_html_figure(xmlnode, figurenode):
+def _format_html_figure(xmlnode, figurenode, with_figures=False):
     tnode = etree.Element("table")
     tnode.set("width", f"{int(figurenode._width * 50)}%")
     xmlnode.append(tnode)
@@ -27,7 +28,10 @@ def _format_html_figure(xmlnode, figurenode):
 
     xynode = etree.Element("td")
     ynode.append(xynode)
-    xynode.text = "(omitted)"
+    if with_figures and (svg := figurenode.obj.as_svg()) is not None:
+        xynode.append(svg)
+    else:
+        xynode.text = "(omitted)"
 
 
 def _format_html_table(xmlnode, tablenode):
@@ -197,7 +201,7 @@ def _format_html_text(xmlnode, treenode, ignore=None, with_newlines=False, with_
     # print(etree.tostring(xmlnode, pretty_print=True).decode("utf-8"))
 
 
-def _format_html(xmlnode, treenode, ignore_formatting=None, with_newlines=False, with_start=True):
+def _format_html(xmlnode, treenode, ignore_formatting=None, with_newlines=False, with_start=True, with_figures=False):
     if ignore_formatting is None:
         ignore_formatting = set()
     # print(xmlnode, treenode.name)
@@ -232,7 +236,7 @@ def _format_html(xmlnode, treenode, ignore_formatting=None, with_newlines=False,
         return
 
     elif treenode.name == "figure":
-        _format_html_figure(xmlnode, treenode)
+        _format_html_figure(xmlnode, treenode, with_figures)
         return
 
     # elif treenode.name == "bits":
@@ -254,10 +258,10 @@ def _format_html(xmlnode, treenode, ignore_formatting=None, with_newlines=False,
         with_start = False
 
     for child in treenode.children:
-        _format_html(current, child, ignore_formatting, with_newlines, with_start)
+        _format_html(current, child, ignore_formatting, with_newlines, with_start, with_figures)
 
 
-def format_document(document):
+def format_document(document, with_figures=False):
     html = etree.Element("html")
 
     head = etree.Element("head")
@@ -271,12 +275,29 @@ def format_document(document):
     body = etree.Element("body")
     html.append(body)
 
-    _format_html(body, document, with_newlines=True)
+    _format_html(body, document, with_newlines=True, with_figures=with_figures)
 
     html = etree.ElementTree(html)
     return html
 
 
-def write_html(html, path, pretty=True):
-    with open(path, "wb") as f:
-        html.write(f, pretty_print=pretty, doctype="<!DOCTYPE html>")
+def _write_figures(html, path):
+    # Move the inline SVG figures into side files next to the HTML file
+    path = Path(path)
+    svg_tag = "{http://www.w3.org/2000/svg}svg"
+    for ii, svg in enumerate(list(html.iter(svg_tag))):
+        table = next((a for a in svg.iterancestors("table") if a.get("id")), None)
+        name = table.get("id") if table is not None else f"figure_{ii}"
+        svg_path = path.with_name(f"{uncompressed_path(path).stem}_{name}.svg")
+        write_if_changed(svg_path, etree.tostring(svg, xml_declaration=True, encoding="utf-8"))
+        img = etree.Element("img")
+        img.set("src", svg_path.name)
+        svg.getparent().replace(svg, img)
+
+
+def write_html(html, path, pretty=True, figure_files=False, dictionary=None) -> bool:
+    if figure_files:
+        _write_figures(html, path)
+    # Compressed depending on the suffix of the path and skipped if unchanged
+    data = etree.tostring(html, pretty_print=pretty, doctype="<!DOCTYPE html>")
+    return write_compressed(path, data, dictionary=dictionary)
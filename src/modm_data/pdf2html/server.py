@@ -0,0 +1,183 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+"""
+Conversion daemon that keeps a pool of warm worker processes with open
+documents and their caches, so that repeated conversions do not pay for the
+interpreter start, the imports and the document loading every time.
+
+Jobs are exchanged as one JSON object per line over a Unix socket:
+
+- `document`: absolute path to the PDF.
+- `output`: absolute output path.
+- `pages`, `ranges`: 1-indexed page selection as for `page_range()`.
+- `chapters`, `all`, `figures`, `compression`, `dictionary`: options passed on to `convert()`.
+
+The result is a JSON object with the `success` flag, the captured `log` and
+the `writes` counts of the job. If a worker process dies during the job, the
+connection is closed without a result, so that the client can fall back to
+converting in a subprocess.
+"""
+
+import io
+import json
+import signal
+import socket
+import logging
+import traceback
+import contextlib
+import threading
+import socketserver
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .convert import convert, page_range
+from ..pdf import map_file
+from ..utils import WRITES
+
+_LOGGER = logging.getLogger(__name__)
+
+_DOCUMENT_CLASS = None
+_DOCUMENTS_MAX = 2
+_DOCUMENTS = OrderedDict()
+
+
+def _init_worker(document_class, max_documents: int):
+    global _DOCUMENT_CLASS, _DOCUMENTS_MAX
+    _DOCUMENT_CLASS = document_class
+    _DOCUMENTS_MAX = max_documents
+
+
+def _document(path: str):
+    # Keep the most recently used documents open, but reopen them if changed
+    key = (path, Path(path).stat().st_mtime_ns)
+    if (doc := _DOCUMENTS.pop(key, None)) is None:
+        doc = _DOCUMENT_CLASS(path, buffer=map_file(path))
+    _DOCUMENTS[key] = doc
+    while len(_DOCUMENTS) > _DOCUMENTS_MAX:
+        _DOCUMENTS.popitem(last=False)
+    return doc
+
+
+def _run_job(job: dict) -> dict:
+    log = io.StringIO()
+    success = False
+    writes = WRITES.copy()
+    with contextlib.redirect_stdout(log):
+        try:
+            doc = _document(job["document"])
+            if doc.page_count == 0 or not doc.page(1).width:
+                print("Corrupt PDF!")
+                return {"success": False, "log": log.getvalue(), "writes": {}}
+            success = convert(
+                doc,
+                page_range(doc, job.get("pages"), job.get("ranges")),
+                Path(job["output"]),
+                format_chapters=job.get("chapters", False),
+                render_all=job.get("all", False),
+                figures=job.get("figures"),
+                compression=job.get("compression"),
+                dictionary=job.get("dictionary"),
+            )
+        except Exception:
+            print(traceback.format_exc())
+    return {"success": bool(success), "log": log.getvalue(), "writes": dict(WRITES - writes)}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                job = json.loads(line)
+                _LOGGER.info(f"Converting {job['document']} -> {job['output']}")
+            except (ValueError, TypeError, KeyError) as error:
+                result = {"success": False, "log": f"Invalid job: {error!r}\n", "writes": {}}
+            else:
+                if (result := self.server.run(job)) is None:
+                    return
+            self.wfile.write(json.dumps(result).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path, executor_factory):
+        super().__init__(str(socket_path), _Handler)
+        self._lock = threading.Lock()
+        self._executor_factory = executor_factory
+        self.executor = executor_factory()
+
+    def run(self, job: dict) -> dict | None:
+        with self._lock:
+            executor = self.executor
+        try:
+            return executor.submit(_run_job, job).result()
+        except BrokenProcessPool:
+            # A worker crashed, e.g. inside pdfium, which breaks the entire pool
+            _LOGGER.error(f"Worker process died converting {job['document']}!")
+            with self._lock:
+                if self.executor is executor:
+                    executor.shutdown(wait=False)
+                    self.executor = self._executor_factory()
+            return None
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(cancel_futures=True)
+
+
+def serve(socket_path: Path, document_class, workers: int = None, max_documents: int = 2) -> bool:
+    """
+    Serves conversion jobs on a Unix socket until interrupted.
+
+    :param socket_path: path of the Unix socket to listen on.
+    :param document_class: the vendor-specific `modm_data.pdf.Document` class.
+    :param workers: number of worker processes, defaults to the CPU count.
+    :param max_documents: number of documents each worker keeps open.
+    """
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)
+
+    def _executor():
+        return ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(document_class, max_documents))
+
+    with _Server(socket_path, _executor) as server:
+        # Background processes ignore SIGINT, so also stop on SIGTERM
+        signal.signal(signal.SIGTERM, _interrupt)
+        _LOGGER.info(f"Serving conversion jobs on '{socket_path}'")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
+    return True
+
+
+def submit(socket_path: Path, job: dict) -> dict | None:
+    """
+    Submits a conversion job to the daemon and waits for its result.
+
+    :param socket_path: path of the Unix socket of the daemon.
+    :param job: the job description.
+    :return: the job result or `None` if no daemon is listening.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps(job).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as response:
+                line = response.readline()
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+    if not line:
+        return None
+    return json.loads(line)
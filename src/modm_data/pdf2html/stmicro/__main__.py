@@ -3,13 +3,40 @@
 
 import re
 import tqdm
+import shlex
 import logging
 import argparse
+import threading
 import subprocess
 from pathlib import Path
+from collections import Counter
 from multiprocessing.pool import ThreadPool
 
-from .. import convert, patch
+from .. import convert, patch, compress
+from ..convert import page_range
+from ..server import serve, submit
+from ...utils import WRITES, format_writes, parse_writes
+
+
+def _command(job: dict) -> str:
+    # The same conversion as the daemon job but in a fresh interpreter
+    command = ["python3", "-m", "modm_data.pdf2html.stmicro", "--document", job["document"]]
+    command += ["--output", job["output"], "--html"]
+    for page in job["pages"] or []:
+        command += ["--page", str(page)]
+    for arange in job["ranges"] or []:
+        command += ["--range", arange]
+    if job["chapters"]:
+        command.append("--chapters")
+    if job["all"]:
+        command.append("--all")
+    if job["figures"]:
+        command += ["--figures", job["figures"]]
+    if job["compression"]:
+        command += ["--compress", job["compression"]]
+    if job["dictionary"]:
+        command += ["--dictionary", job["dictionary"]]
+    return shlex.join(command)
 
 
 def main():
@@ -28,29 +55,46 @@ def main():
     parser.add_argument("--chapters", action="store_true")
     parser.add_argument("--tags", action="store_true")
     parser.add_argument("--all", action="store_true")
+    parser.add_argument("--figures", choices=["inline", "files"])
+    parser.add_argument("--compress", choices=["gzip", "zstd"], help="Compress the chapter files.")
+    parser.add_argument("--dictionary", type=Path, help="Compress with this zstd dictionary.")
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--socket", type=Path, default=Path("log/stmicro/pdf2html.sock"))
+    parser.add_argument("--jobs", type=int)
     parser.add_argument("-v", dest="verbose", action="count", default=0)
     args = parser.parse_args()
     logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
 
+    if args.serve:
+        return serve(args.socket, modm_data.pdf2html.stmicro.Document, args.jobs)
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _job(ranges, output, pages=None, chapters=args.chapters, compression=args.compress):
+        return {
+            "document": str(args.document.absolute()),
+            "output": str(Path(output).absolute()),
+            "pages": pages,
+            "ranges": ranges,
+            "chapters": chapters,
+            "all": args.all,
+            "figures": args.figures,
+            "compression": compression,
+            "dictionary": str(args.dictionary.absolute()) if args.dictionary and compression else None,
+        }
+
+    # Hand off the HTML conversion to the daemon if it is running
+    if args.html and not any((args.parallel, args.pdf, args.ast, args.tree, args.tags)):
+        if (result := submit(args.socket, _job(args.range, output_path, args.page))) is not None:
+            print(result["log"], end="")
+            return result["success"]
+
     doc = modm_data.pdf2html.stmicro.Document(args.document)
     if doc.page_count == 0 or not doc.page(1).width:
         print("Corrupt PDF!")
         exit(1)
 
-    if args.page or args.range:
-        page_range = list(map(lambda p: p - 1, args.page or []))
-        if args.range:
-            for arange in args.range:
-                start, stop = arange.split(":")
-                arange = range(int(start or 0), int(stop or doc.page_count - 1) + 1)
-                page_range.extend([p - 1 for p in arange])
-        page_range.sort()
-    else:
-        page_range = range(doc.page_count)
-
-    output_path = Path(args.output)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-
     if args.parallel:
         log = Path(f"log/stmicro/html/{doc.name}.txt")
         log.parent.mkdir(exist_ok=True, parents=True)
@@ -73,27 +117,49 @@ def main():
             ranges = [(p0, p1, t0) for (p0, t0), (p1, t1) in zip(dests, dests[1:]) if p0 != p1]
             calls = []
             for ii, (p0, p1, title) in enumerate(ranges):
-                call = (
-                    f"python3 -m modm_data.pdf2html.stmicro "
-                    f"--document {args.document} --range {p0 + 1}:{p1} --html "
-                    f"--output {output_dir}/chapter_{ii}_{title}.html"
-                )
-                calls.append(call + f" >> {log} 2>&1")
+                output = f"{output_dir}/chapter_{ii}_{title}.html"
+                # The chapters are compressed only after patching the plain files
+                job = _job([f"{p0 + 1}:{p1}"], output, chapters=False, compression=None)
+                call = _command(job)
+                calls.append((call, job))
                 print(call, file=logfile)
+
+        log_lock = threading.Lock()
+
+        def _convert(call):
+            # Prefer the warm workers of the daemon over a fresh interpreter
+            command, job = call
+            if (result := submit(args.socket, job)) is not None:
+                output, success = result["log"], result["success"]
+            else:
+                process = subprocess.run(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+                output, success = process.stdout.decode("utf-8", errors="replace"), process.returncode == 0
+            with log_lock, log.open("a") as logfile:
+                logfile.write(output)
+            # The chapters are written by other processes
+            writes[command] = Counter(result.get("writes", {})) if result is not None else parse_writes(output)
+            return success
+
+        writes = {}
         with ThreadPool() as pool:
-            retvals = list(tqdm.tqdm(pool.imap(lambda c: subprocess.run(c, shell=True), calls), total=len(calls)))
-        for retval, call in zip(retvals, calls):
-            if retval.returncode != 0:
+            retvals = list(tqdm.tqdm(pool.imap(_convert, calls), total=len(calls)))
+        for retval, (call, _) in zip(retvals, calls):
+            if not retval:
                 print(call)
-        if all(r.returncode == 0 for r in retvals):
+        if all(retvals):
             from . import data
 
-            return patch(doc, data, output_dir)
+            if not patch(doc, data, output_dir):
+                return False
+            if args.compress:
+                compress(output_dir, args.compress, args.dictionary)
+            print(format_writes(sum(writes.values(), WRITES.copy())))
+            return True
         return False
 
     return convert(
         doc,
-        page_range,
+        page_range(doc, args.page, args.range),
         output_path,
         format_chapters=args.chapters,
         render_html=args.html,
@@ -102,6 +168,9 @@ def main():
         show_ast=args.ast,
         show_tree=args.tree,
         show_tags=args.tags,
+        figures=args.figures,
+        compression=args.compress,
+        dictionary=args.dictionary,
     )
 
 
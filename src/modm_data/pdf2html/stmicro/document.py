@@ -43,8 +43,8 @@ def _normalize_document(document):
 
 
 class Document(PdfDocument):
-    def __init__(self, path: str):
-        super().__init__(path)
+    def __init__(self, path: str, buffer=None):
+        super().__init__(path, buffer=buffer)
         self._normalize = _normalize_document
 
     def page(self, index: int) -> StmPage:
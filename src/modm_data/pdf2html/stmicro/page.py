@@ -3,6 +3,7 @@
 
 import re
 import logging
+from bisect import bisect_left, bisect_right
 from functools import cached_property, reduce
 from collections import defaultdict
 from ..table import Table
@@ -15,6 +16,7 @@ from anytree import Node
 
 
 _LOGGER = logging.getLogger(__name__)
+_CAPTION = re.compile(r"(Figure|Table) \d+\.")
 
 
 def is_compatible(document) -> bool:
@@ -231,6 +233,31 @@ def _spacing_special(page) -> dict:
     return {}
 
 
+def _extend_caption_bottom(rows: list[float], bottom: float, limit: float, height: float) -> float:
+    # Grow the caption downwards one line height at a time as long as each step
+    # adds new characters, but never below the limit (the graphic top)
+    ii = bisect_right(rows, -bottom, key=lambda y: -y)
+    while True:
+        nbottom = max(limit, bottom - height)
+        if ii >= len(rows) or rows[ii] < nbottom:
+            return bottom
+        bottom = nbottom
+        while ii < len(rows) and rows[ii] >= bottom:
+            ii += 1
+
+
+def _extend_graphic_bottom(rows: list[float], bottom: float, step: float) -> float:
+    # Grow the graphic downwards in steps until a step contains no characters
+    ii = 0
+    while True:
+        nbottom = bottom - step
+        while ii < len(rows) and rows[ii] > bottom:
+            ii += 1
+        if ii >= len(rows) or rows[ii] < nbottom:
+            return nbottom
+        bottom = nbottom
+
+
 def _linesize_black_white(line: CharLine) -> str:
     rsize = line.height
     if rsize >= 17.5:
@@ -360,6 +387,29 @@ class Page(BasePage):
         Node("page", parent=first_leaf, xpos=first_leaf.xpos, number=self.number)
         return ast
 
+    @cached_property
+    def _caption_index(self) -> list[tuple[int, str, list]]:
+        # Index all bold "Figure N." and "Table N." clusters of the page once
+        # as (y position in em, kind, chars), sorted top to bottom
+        em = self._spacing["y_em"]
+        captions = []
+        area = Rectangle(0, 0, self.width, self.height)
+        for line in self.charlines_in_area(area, lambda c: "Bold" in c.font):
+            for cluster in line.clusters():
+                if (match := _CAPTION.match(cluster.content)) is not None:
+                    captions.append((int(round(cluster.bbox.y / em)), match.group(1), cluster.chars))
+        return sorted(captions, key=lambda c: -c[0])
+
+    def _text_rows(self, left: float, right: float) -> list[float]:
+        # Y positions of all character lines with characters between left and
+        # right, sorted top to bottom, same semantics as `chars_in_area`
+        rows = []
+        for ypos, chars in reversed(self._charlines.items()):
+            x_left = bisect_left(chars, left, key=lambda c: c.bbox.midpoint.x)
+            if x_left < len(chars) and chars[x_left].bbox.midpoint.x <= right:
+                rows.append(ypos)
+        return rows
+
     def graphics_in_area(self, area: Rectangle) -> list[Table | Figure]:
         # Find all graphic clusters in this area
         em = self._spacing["y_em"]
@@ -373,18 +423,16 @@ class Page(BasePage):
 
         # Find the captions and group them by y origin to catch side-by-side figures
         ycaptions = defaultdict(list)
-        for line in self.charlines_in_area(area, lambda c: "Bold" in c.font):
-            for cluster in line.clusters():
-                for phrase in [r"Figure \d+\.", r"Table \d+\."]:
-                    if re.match(phrase, cluster.content):
-                        ycaptions[int(round(cluster.bbox.y / em))].append((phrase, cluster.chars))
+        for ypos, kind, chars in self._caption_index:
+            if area.contains(chars[0].bbox.midpoint):
+                ycaptions[ypos].append((kind, chars))
         ycaptions = [ycaptions[k] for k in sorted(ycaptions.keys(), key=lambda y: -y)]
 
         # Now associate these captions with the graphics bboxes
         categories = []
         for captions in ycaptions:
             width = area.width / len(captions)
-            for ii, (phrase, chars) in enumerate(sorted(captions, key=lambda c: c[1][0].origin.x)):
+            for ii, (kind, chars) in enumerate(sorted(captions, key=lambda c: c[1][0].origin.x)):
                 left, right = area.left + ii * width, area.left + (ii + 1) * width
                 bottom, top, height = chars[0].bbox.bottom, chars[0].bbox.top, chars[0].height
 
@@ -399,20 +447,13 @@ class Page(BasePage):
 
                 if self._template == "blue_gray":
                     # Search for all lines of the current caption with the same properties
-                    cbbox = Rectangle(left, bottom, right, top)
-                    cchars = self.chars_in_area(cbbox)
-                    while True:
-                        nbbox = Rectangle(left, max(graphic[0].top, cbbox.bottom - height), right, top)
-                        nchars = self.chars_in_area(nbbox)
-                        if len(cchars) >= len(nchars):
-                            break
-                        cbbox = nbbox
-                        cchars = nchars
+                    rows = self._text_rows(left, right)
+                    cbbox = Rectangle(left, _extend_caption_bottom(rows, bottom, graphic[0].top, height), right, top)
                 else:
                     cbbox = Rectangle(left, min(graphic[0].top, bottom), right, top)
 
-                otype = phrase.split(" ")[0].lower()
-                if "Figure" in phrase:
+                otype = kind.lower()
+                if kind == "Figure":
                     # Find all other graphics in the bounding box
                     gbbox = Rectangle(left, graphic[0].bottom, right, cbbox.bottom)
                     graphics = []
@@ -427,14 +468,11 @@ class Page(BasePage):
 
                     if self._template == "blue_gray":
                         # Search for characters below the graphics bbox, max 1 y_em
-                        gbbox = Rectangle(left, gbbox.bottom, right, gbbox.bottom)
-                        while True:
-                            gbbox = Rectangle(left, gbbox.bottom - self._spacing["y_em"], right, gbbox.bottom)
-                            if not self.chars_in_area(gbbox):
-                                break
+                        bottom = _extend_graphic_bottom(rows, gbbox.bottom, self._spacing["y_em"])
+                        gbbox = Rectangle(left, bottom, right, bottom)
                     # Generate the new bounding box which includes the caption
                     gbbox = Rectangle(left, gbbox.bottom, right, cbbox.bottom)
-                elif "Table" in phrase:
+                elif kind == "Table":
                     graphic_clusters.remove(graphic)
                     gbbox, paths = graphic
                     if (
@@ -277,176 +277,211 @@ class Table:
         return self._cells
 
     def append_bottom(self, other, merge_headers=True) -> bool:
-        debug = False
-        xgrid = self.grid[0]
+        builder = TableBuilder(self)
+        if not builder.append_bottom(other, merge_headers):
+            return False
+        builder.close()
+        return True
+
+    def append_side(self, other, expand=False) -> bool:
+        builder = TableBuilder(self)
+        if not builder.append_side(other, expand):
+            return False
+        builder.close()
+        return True
+
+    @cached_property
+    def header_rows(self) -> int:
+        header_cells = [c for c in self.cells if c.is_header]
+        if header_cells:
+            return max(c.positions[-1][0] + 1 for c in header_cells)
+        return 0
+
+    def __repr__(self) -> str:
+        return f"Table({self.grid[0]}x{self.grid[1]})"
+
+
+def _header_columns(headers: list[Cell], columns: int) -> dict[int, set[int]]:
+    # Find the smallest set of spanning xpositions based on the header cells
+    xheaders = defaultdict(set)
+    for hcell in headers:
+        for _, xpos in hcell.positions:
+            if xpos < columns:
+                xheaders[hcell.x].add(xpos)
+    return xheaders
+
+
+def _column_ops(own_xpos: list[int], merged_xpos: list[int]) -> list[tuple[int, list[int], bool]]:
+    # We want to stuff/move the cell positions inplace, therefore we start
+    # backwards moving the high numbers even higher, so that we don't
+    # overwrite ourselves and get stuck in an infinite loop
+    ops = []
+    for ii in range(max(len(own_xpos), len(merged_xpos))):
+        if ii >= len(own_xpos):
+            # If our set is empty we must only insert positions
+            ops.append((merged_xpos[ii - 1], merged_xpos[ii:], True))
+            break
+        # We must move (=replace and add) the span positions
+        ops.append((own_xpos[ii], merged_xpos[ii : ii + 1], False))
+    return ops
+
+
+def _column_map(ops: list[tuple[int, list[int], bool]], columns: int) -> dict[int, tuple[int, ...]]:
+    # Simulate the operations on every column once to get the mapping of
+    # each old column to its new columns, leaving out unchanged columns
+    cmap = {}
+    for xpos in range(columns):
+        xs = [xpos]
+        for src, dsts, insert_only in ops:
+            nxs = []
+            for cx in xs:
+                if cx == src:
+                    nxs.extend(dsts)
+                    if insert_only:
+                        nxs.append(cx)
+                else:
+                    nxs.append(cx)
+            xs = nxs
+        if xs != [xpos]:
+            cmap[xpos] = tuple(xs)
+    return cmap
+
+
+def _compose_column_maps(first: dict, then: dict) -> dict[int, tuple[int, ...]]:
+    if not then:
+        return first
+    cmap = {}
+    for xpos in first.keys() | then.keys():
+        xs = tuple(nx for fx in first.get(xpos, (xpos,)) for nx in then.get(fx, (fx,)))
+        if xs != (xpos,):
+            cmap[xpos] = xs
+    return cmap
+
+
+class TableBuilder:
+    """
+    Assembles a table spanning multiple pages by appending blocks of cells at
+    the bottom or to the side. The column remapping of already appended cells
+    is deferred and the final cell list is only sorted when the table is closed,
+    so that appending is linear in the size of the appended table.
+    """
+
+    def __init__(self, table: Table):
+        self.table = table
+        # Header cells are always kept up-to-date since they define the columns
+        self._headers = [c for c in table.cells if c.is_header]
+        self._blocks = [[c for c in table.cells if not c.is_header]]
+        # Column maps as (number of blocks they apply to, map)
+        self._xmaps = []
+
+    def _flush(self):
+        # Apply all pending column maps from the last block backwards
+        cmap = {}
+        xmaps = list(self._xmaps)
+        for index in reversed(range(len(self._blocks))):
+            while xmaps and xmaps[-1][0] > index:
+                cmap = _compose_column_maps(xmaps.pop()[1], cmap)
+            if cmap:
+                for cell in self._blocks[index]:
+                    cell._remap_columns(cmap)
+        self._blocks = [[c for block in self._blocks for c in block]]
+        self._xmaps = []
+
+    def append_bottom(self, other: Table, merge_headers: bool = True) -> bool:
+        table = self.table
+        xgrid = table.grid[0]
+        other_map = None
         if merge_headers and xgrid != other.grid[0]:
             # Some tables have different column layouts due to span cells
             # So we must correct the X positions of all cells accordingly
-            self_xheaders = defaultdict(set)
-            other_xheaders = defaultdict(set)
-            self_headers = [c for c in self.cells if c.is_header]
-            other_headers = [c for c in other.cells if c.is_header]
-            # Find the smallest set of spanning xpositions based on the header cells
-            for xpos in range(self.grid[0]):
-                for hcell in self_headers:
-                    if any(p[1] == xpos for p in hcell.positions):
-                        self_xheaders[hcell.x].add(xpos)
-            for xpos in range(other.grid[0]):
-                for hcell in other_headers:
-                    if any(p[1] == xpos for p in hcell.positions):
-                        other_xheaders[hcell.x].add(xpos)
-
-            # Compute the shared
+            self_xheaders = _header_columns(self._headers, table.grid[0])
+            other_xheaders = _header_columns([c for c in other.cells if c.is_header], other.grid[0])
             self_heads = sorted(self_xheaders.keys())
             other_heads = sorted(other_xheaders.keys())
+            # If they are not equal length the table layouts are not compatible at all!
+            if len(self_heads) != len(other_heads):
+                _LOGGER.error(f"Failure to append table {other} ({other._page}) onto table {table} ({table._page})")
+                return False
+
+            # Zip the groups together, these represent the matching header group spans
             xgrid = 0
             merged_xheaders = defaultdict(set)
-            # Zip the groups together, these represent the matching header group spans
             for self_xhead, other_xhead in zip(self_heads, other_heads):
                 size = max(len(self_xheaders[self_xhead]), len(other_xheaders[other_xhead]))
                 merged_xheaders[max(self_xhead, other_xhead)] = set(range(xgrid, xgrid + size))
                 xgrid += size
 
-            if debug:
-                print(len(self_xheaders), self_xheaders)
-                print(len(other_xheaders), other_xheaders)
-                print(len(merged_xheaders), merged_xheaders)
-            # If they are not equal length the table layouts are not compatible at all!
-            if len(self_heads) != len(other_heads):
-                _LOGGER.error(f"Failure to append table {other} ({other._page}) onto table {self} ({self._page})")
-                return False
-
-            # We want to stuff/move the cell positions inplace, therefore we start
-            # backwards moving the high numbers even higher, so that we don't
-            # overwrite ourselves and get stuck in an infinite loop
-            # Zip the groups together, these represent the matching header group spans
+            self_ops, other_ops = [], []
             for self_xhead, other_xhead in zip(reversed(self_heads), reversed(other_heads)):
-                merged_xhead = max(self_xhead, other_xhead)
+                merged_xpos = sorted(merged_xheaders[max(self_xhead, other_xhead)], reverse=True)
                 self_xpos = sorted(self_xheaders[self_xhead], reverse=True)
                 other_xpos = sorted(other_xheaders[other_xhead], reverse=True)
-                merged_xpos = sorted(merged_xheaders[merged_xhead], reverse=True)
-
-                def _insert_cells(cell, src, dsts, insert_only):
-                    assert dsts
-                    new_positions = []
-                    any_change = False
-                    for cpos in reversed(cell.positions):
-                        if insert_only:
-                            # If our set is empty we must only insert positions
-                            if cpos[1] == src:
-                                for xpos in dsts:
-                                    if debug:
-                                        print(f"Insert {cpos}++{(cpos[0], xpos)}")
-                                    new_positions.append((cpos[0], xpos))
-                                    any_change = True
-                            new_positions.append(cpos)
-                        else:
-                            # We must move (=replace and add) the span positions
-                            if cpos[1] == src:
-                                if debug:
-                                    print(f"Move {cpos}->{(cpos[0], dsts[0])}")
-                                new_positions.append((cpos[0], dsts[0]))
-                                any_change = True
-                            else:
-                                new_positions.append(cpos)
-                    if debug and any_change:
-                        print(f"{cell}: {src}->{dsts} {'I' if insert_only else 'M'}")
-                        print("old=", cell.positions, "new=", sorted(new_positions))
-                        print()
-                    assert new_positions
-                    assert len(new_positions) == len(set(new_positions))
-                    cell.positions = sorted(new_positions)
-                    cell._invalidate()
-
-                def _move_cells(cells, own_xpos):
-                    if debug:
-                        print()
-                        print(f"====== Rewrite rows: {own_xpos}->{merged_xpos} ======")
-                        print()
-
-                    for ii in range(max(len(own_xpos), len(merged_xpos))):
-                        insert_only = ii >= len(own_xpos)
-                        if insert_only:
-                            src = merged_xpos[ii - 1]
-                            dsts = merged_xpos[ii:]
-                            if debug:
-                                print(f"{src}->{dsts} I")
-                            for cell in cells:
-                                _insert_cells(cell, src, dsts, True)
-                            break
-                        else:
-                            src = own_xpos[ii]
-                            dsts = merged_xpos[ii : ii + 1]
-                            if debug:
-                                print(f"{src}->{dsts} M")
-                            for cell in cells:
-                                _insert_cells(cell, src, dsts, False)
-
-                if debug:
-                    print()
                 if self_xpos != merged_xpos:
-                    if debug:
-                        print(f"====== Self:  x={self_xhead}->{merged_xhead} xpos={self_xpos}->{merged_xpos}")
-                    _move_cells(self.cells, self_xpos)
+                    self_ops.extend(_column_ops(self_xpos, merged_xpos))
                 if other_xpos != merged_xpos:
-                    if debug:
-                        print(
-                            f"====== Other: x={other_xhead}->{merged_xhead} xpos={other_xheaders[other_xhead]}->{merged_xheaders[merged_xhead]}"
-                        )
-                    _move_cells(other.cells, other_xpos)
-            if debug:
-                print()
-                print()
-                print()
+                    other_ops.extend(_column_ops(other_xpos, merged_xpos))
+
+            if self_map := _column_map(self_ops, table.grid[0]):
+                for cell in self._headers:
+                    cell._remap_columns(self_map)
+                self._xmaps.append((len(self._blocks), self_map))
+            other_map = _column_map(other_ops, other.grid[0])
 
         # We must move the cells downwards now, but minus the header rows
-        rows = self.grid[1] - other.header_rows
+        rows = table.grid[1] - other.header_rows
+        block = []
         for cell in other.cells:
             # Discard the header cells, we just assume they are the same
             if not cell.is_header:
+                if other_map:
+                    cell._remap_columns(other_map)
                 cell._move(0, rows)
-                self.cells.append(cell)
-        self.cells.sort(key=lambda c: c.positions[0])
-        self.grid = (xgrid, other.grid[1] + rows)
-        if debug:
-            print(f"{self._page} -> {self.grid}")
+                block.append(cell)
+        self._blocks.append(block)
+        table.grid = (xgrid, other.grid[1] + rows)
         return True
 
-    def append_side(self, other, expand=False) -> bool:
-        if self.grid[1] != other.grid[1]:
+    def append_side(self, other: Table, expand: bool = False) -> bool:
+        table = self.table
+        if table.grid[1] != other.grid[1]:
             if expand:
                 _LOGGER.debug(
-                    f"Expanding bottom cells to match height: {self} ({self._page}) + {other} ({other._page})"
+                    f"Expanding bottom cells to match height: {table} ({table._page}) + {other} ({other._page})"
                 )
-                ymin = min(self.grid[1], other.grid[1])
-                ymax = max(self.grid[1], other.grid[1])
-                etable = other if self.grid[1] > other.grid[1] else self
-                for cell in etable.cells:
+                ymin = min(table.grid[1], other.grid[1])
+                ymax = max(table.grid[1], other.grid[1])
+                if table.grid[1] > other.grid[1]:
+                    etable, cells = other, other.cells
+                else:
+                    # Expanding needs the final column positions
+                    self._flush()
+                    etable, cells = table, self._headers + self._blocks[0]
+                for cell in cells:
                     if any(p[0] == ymin - 1 for p in cell.positions):
                         cell._expand(0, ymax - ymin)
                 etable.grid = (etable.grid[0], ymax)
             else:
-                _LOGGER.error(f"Unable to append table at side: {self} ({self._page}) + {other} ({other._page})")
+                _LOGGER.error(f"Unable to append table at side: {table} ({table._page}) + {other} ({other._page})")
                 return False
 
         # We must move all cells to the right now
-        columns = self.grid[0]
+        columns = table.grid[0]
+        block = []
         for cell in other.cells:
             cell._move(columns, 0)
-            self.cells.append(cell)
-        self.cells.sort(key=lambda c: c.positions[0])
-        self.grid = (other.grid[0] + columns, max(self.grid[1], other.grid[1]))
+            if cell.is_header:
+                self._headers.append(cell)
+            else:
+                block.append(cell)
+        self._blocks.append(block)
+        table.grid = (other.grid[0] + columns, max(table.grid[1], other.grid[1]))
         return True
 
-    @cached_property
-    def header_rows(self) -> int:
-        header_cells = [c for c in self.cells if c.is_header]
-        if header_cells:
-            return max(c.positions[-1][0] + 1 for c in header_cells)
-        return 0
-
-    def __repr__(self) -> str:
-        return f"Table({self.grid[0]}x{self.grid[1]})"
+    def close(self) -> Table:
+        """Materializes the sorted cell list of the assembled table."""
+        self._flush()
+        self.table._cells = sorted(self._headers + self._blocks[0], key=lambda c: c.positions[0])
+        return self.table
 
 
 class VirtualTable(Table):
@@ -1,7 +1,17 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
-from .model import Device, PeripheralType, Peripheral, Register, BitField, compare_device_trees
+from .model import (
+    Device,
+    PeripheralType,
+    Peripheral,
+    Register,
+    BitField,
+    compare_device_trees,
+    diff_device_trees,
+    diff_memory_maps,
+    diff_counts,
+)
 from .write import format_svd, write_svd
 from .read import read_svd
 
@@ -13,6 +23,9 @@ __all__ = [
     "Register",
     "BitField",
     "compare_device_trees",
+    "diff_device_trees",
+    "diff_memory_maps",
+    "diff_counts",
     "format_svd",
     "write_svd",
     "read_svd",
@@ -1,24 +1,63 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
+import hashlib
+from collections import Counter
 from anytree import Node
 
 
-class Device(Node):
+class _MerkleNode(Node):
+    """
+    Node with a digest of its subtree that is computed lazily and cached until
+    an attribute is assigned or the tree structure below it changes. In-place
+    changes of attribute values, e.g. of the filters, are not detected.
+    """
+
+    _digest = None
+
+    def _fields(self) -> str:
+        return ""
+
+    @property
+    def digest(self) -> bytes:
+        if self._digest is None:
+            digest = hashlib.blake2b(self._fields().encode("utf-8") + b"\0", digest_size=16)
+            for child in self.children:
+                digest.update(child.digest)
+            self._digest = digest.digest()
+        return self._digest
+
+    def _invalidate(self):
+        # Ancestors of a node without digest do not have a digest either
+        node = self
+        while node is not None and node._digest is not None:
+            node._digest = None
+            node = node.parent
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._invalidate()
+
+    def _post_attach(self, parent):
+        parent._invalidate()
+
+    def _post_detach(self, parent):
+        parent._invalidate()
+
+
+class Device(_MerkleNode):
     def __init__(self, name, **kw):
         if "compatible" not in kw:
             kw["compatible"] = [name]
         super().__init__(name, **kw)
 
+    def _fields(self) -> str:
+        # Devices with the same memory map have the same digest
+        return ""
+
     def __hash__(self) -> int:
-        value = 0
-        for peripheral in self.children:
-            value += hash(peripheral)
-            for register in peripheral.children:
-                value += hash(register)
-                for bitfield in register.children:
-                    value += hash(bitfield)
-        return value
+        return int.from_bytes(self.digest[:8], "little")
 
     def __eq__(self, other) -> bool:
         if isinstance(other, self.__class__):
@@ -27,16 +66,19 @@ class Device(Node):
             return NotImplemented
 
 
-class PeripheralType(Node):
+class PeripheralType(_MerkleNode):
     def __init__(self, name, **kw):
         super().__init__(name, **kw)
 
-    def __hash__(self) -> int:
-        value = hash(self.name)
+    def _fields(self) -> str:
+        value = self.name
         if hasattr(self, "filters") and self.filters:
-            value += hash(str(self.filters))
+            value += f" {self.filters}"
         return value
 
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
     def __eq__(self, other) -> bool:
         if isinstance(other, self.__class__):
             return self.name == other.name and self.filters == other.filters
@@ -44,16 +86,20 @@ class PeripheralType(Node):
             return NotImplemented
 
 
-class Peripheral(Node):
+class Peripheral(_MerkleNode):
     def __init__(self, name, type, address, **kw):
         super().__init__(name, type=type, address=address, **kw)
 
-    def __hash__(self) -> int:
-        value = hash(f"{self.name} {self.address} {self.type}")
+    def _fields(self) -> str:
+        # The type only records how the peripheral was serialized
+        value = f"{self.name} {self.address}"
         if hasattr(self, "filters") and self.filters:
-            value += hash(str(self.filters))
+            value += f" {self.filters}"
         return value
 
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
     def __eq__(self, other) -> bool:
         if isinstance(other, self.__class__):
             return self.name == other.name and self.address == other.address
@@ -61,7 +107,7 @@ class Peripheral(Node):
             return NotImplemented
 
 
-class Register(Node):
+class Register(_MerkleNode):
     def __init__(self, name, offset, width=None, **kw):
         super().__init__(name, offset=offset, width=width or 4, **kw)
 
@@ -74,12 +120,15 @@ class Register(Node):
         for ii in range(self.width):
             yield self.parent.address + self.offset + ii
 
-    def __hash__(self) -> int:
-        value = hash(f"{self.name} {self.offset} {self.width}")
+    def _fields(self) -> str:
+        value = f"{self.name} {self.offset} {self.width}"
         if hasattr(self, "filters") and self.filters:
-            value += hash(str(self.filters))
+            value += f" {self.filters}"
         return value
 
+    def __hash__(self) -> int:
+        return hash(self._fields())
+
     def __eq__(self, other) -> bool:
         if isinstance(other, self.__class__):
             return self.name == other.name and self.offset == other.offset
@@ -87,7 +136,7 @@ class Register(Node):
             return NotImplemented
 
 
-class BitField(Node):
+class BitField(_MerkleNode):
     def __init__(self, name, position, width=None, **kw):
         super().__init__(name, position=position, width=width or 1, **kw)
 
@@ -100,8 +149,11 @@ class BitField(Node):
         for ii in range(self.width):
             yield self.parent.address * 8 + self.position + ii
 
+    def _fields(self) -> str:
+        return f"{self.name} {self.position} {self.width}"
+
     def __hash__(self) -> int:
-        return hash(f"{self.name} {self.position} {self.width}")
+        return hash(self._fields())
 
     def __eq__(self, other) -> bool:
         if isinstance(other, self.__class__):
@@ -116,6 +168,9 @@ class BitField(Node):
 
 
 def _compare_trees(left, right):
+    # Equal digests imply equal subtrees
+    if left.digest == right.digest:
+        return True
     if left != right:
         return False
     if len(left.children) != len(right.children):
@@ -127,8 +182,109 @@ def _compare_trees(left, right):
 
 def compare_device_trees(left, right):
     assert isinstance(left, Device) and isinstance(right, Device)
+    # Equal digests imply equal trees, but not the other way around, since
+    # the comparison ignores some attributes, like the filters
+    if left.digest == right.digest:
+        return True
     if len(left.children) != len(right.children):
         return False
     if not left.children:
         return True
     return all(_compare_trees(left, right) for left, right in zip(left.children, right.children))
+
+
+def diff_device_trees(left, right) -> dict[str, tuple]:
+    """
+    Finds the peripherals that differ between two devices by their digests,
+    so only the changed subtrees need to be compared further.
+
+    :return: the differing peripherals by name as `(left, right)` tuples,
+             with `None` for peripherals missing in one of the devices.
+    """
+    assert isinstance(left, Device) and isinstance(right, Device)
+    if left.digest == right.digest:
+        return {}
+    lperipherals = {p.name: p for p in left.children}
+    rperipherals = {p.name: p for p in right.children}
+    diff = {}
+    for name in sorted(lperipherals.keys() | rperipherals.keys()):
+        lper, rper = lperipherals.get(name), rperipherals.get(name)
+        if lper is None or rper is None or lper.digest != rper.digest:
+            diff[name] = (lper, rper)
+    return diff
+
+
+# Attributes of each node that are compared and the name of its children
+_DIFF_ATTRIBUTES = {
+    Peripheral: ("address", "registers"),
+    Register: ("offset", "width", "fields"),
+    BitField: ("position", "width", None),
+}
+
+
+def _diff_nodes(left, right) -> dict:
+    *attributes, children = _DIFF_ATTRIBUTES[type(left)]
+    diff = {}
+    for attribute in attributes:
+        if (lvalue := getattr(left, attribute)) != (rvalue := getattr(right, attribute)):
+            diff[attribute] = [lvalue, rvalue]
+    if children is not None and (cdiff := _diff_children(left.children, right.children)):
+        diff[children] = cdiff
+    return diff
+
+
+def _diff_children(lchildren, rchildren) -> dict:
+    lchildren = {c.name: c for c in lchildren}
+    rchildren = {c.name: c for c in rchildren}
+    diff = {}
+    if added := sorted(rchildren.keys() - lchildren.keys()):
+        diff["added"] = added
+    if removed := sorted(lchildren.keys() - rchildren.keys()):
+        diff["removed"] = removed
+    changed = {}
+    for name in sorted(lchildren.keys() & rchildren.keys()):
+        # Identical subtrees are skipped without comparing them
+        lchild, rchild = lchildren[name], rchildren[name]
+        if lchild.digest != rchild.digest and (cdiff := _diff_nodes(lchild, rchild)):
+            changed[name] = cdiff
+    if changed:
+        diff["changed"] = changed
+    return diff
+
+
+def diff_memory_maps(left, right) -> dict:
+    """
+    Compares two devices by the names of their peripherals, registers and
+    bit fields. Subtrees with the same digest are skipped, so similar memory
+    maps are compared quickly.
+
+    :return: the nested differences as a JSON serializable dictionary, for
+             example, `{"peripherals": {"added": [...], "removed": [...],
+             "changed": {"GPIOA": {"address": [left, right], "registers":
+             {...}}}}}`, or an empty dictionary for identical memory maps.
+    """
+    assert isinstance(left, Device) and isinstance(right, Device)
+    peripherals = diff_device_trees(left, right)
+    lperipherals = [lper for lper, _ in peripherals.values() if lper is not None]
+    rperipherals = [rper for _, rper in peripherals.values() if rper is not None]
+    if diff := _diff_children(lperipherals, rperipherals):
+        return {"peripherals": diff}
+    return {}
+
+
+def diff_counts(diff: dict, counts: Counter = None) -> Counter:
+    """
+    :param diff: the differences from `diff_memory_maps()`.
+    :return: the number of added, removed and changed nodes per level, for
+             example, `counts["registers", "added"]`.
+    """
+    counts = Counter() if counts is None else counts
+    for level, cdiff in diff.items():
+        if not isinstance(cdiff, dict):
+            continue
+        counts[level, "added"] += len(cdiff.get("added", []))
+        counts[level, "removed"] += len(cdiff.get("removed", []))
+        counts[level, "changed"] += len(cdiff.get("changed", {}))
+        for ndiff in cdiff.get("changed", {}).values():
+            diff_counts(ndiff, counts)
+    return counts
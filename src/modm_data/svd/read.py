@@ -1,24 +1,136 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
+import re
+from lxml import etree
 from .model import Device, Peripheral, Register, BitField
 
 
+def _int(text: str | None) -> int | None:
+    # Same number formats as the CMSIS-SVD scaledNonNegativeInteger
+    if text is None:
+        return None
+    text = text.strip().lower()
+    try:
+        if text.startswith("0x"):
+            return int(text[2:], 16)
+        if text.startswith("#"):
+            # Don't care bits are replaced by zeros
+            text = text.replace("x", "0")[1:]
+            return int(text, 2) if all(c in "01" for c in text) else int(text)
+        if text.startswith("true"):
+            return 1
+        if text.startswith("false"):
+            return 0
+        return int(text)
+    except ValueError:
+        return None
+
+
+def _fields(register) -> list[tuple[str, int, int]]:
+    fields = []
+    for field in register.iterfind("fields/field"):
+        # One pass over the children is much faster than several findtext()
+        values = {child.tag: child.text for child in field}
+        name = values["name"]
+        if "reserved" in name.lower():
+            continue
+        if (bit_range := values.get("bitRange")) is not None:
+            msb, lsb = map(int, re.search(r"\[(\d+):(\d+)\]", bit_range).groups())
+            position, width = lsb, msb - lsb + 1
+        elif (msb := _int(values.get("msb"))) is not None:
+            position = _int(values.get("lsb"))
+            width = msb - position + 1
+        else:
+            position, width = _int(values.get("bitOffset")), _int(values.get("bitWidth"))
+        fields.append((name, position, width))
+    return fields
+
+
+def _dim_indices(register, dim: int) -> list:
+    if (text := register.findtext("dimIndex")) is None:
+        return list(range(dim))
+    if "," in text:
+        return text.split(",")
+    if match := re.search(r"(\d+)-(\d+)", text):
+        return list(range(int(match.group(1)), int(match.group(2)) + 1))
+    raise ValueError(f"Unexpected dimIndex: {text!r}")
+
+
+def _registers(peripheral) -> list[tuple] | None:
+    # (name, offset, size, derivedFrom, fields) with single registers before arrays
+    if (registers := peripheral.find("registers")) is None:
+        return None
+    singles, arrays = [], []
+    for register in registers.iterfind("register"):
+        name = register.findtext("name")
+        offset = _int(register.findtext("addressOffset"))
+        size = _int(register.findtext("size"))
+        derived = register.findtext("derivedFrom")
+        fields = _fields(register)
+        if (dim := _int(register.findtext("dim"))) is None:
+            singles.append((name, offset, size, derived, fields))
+        else:
+            increment = _int(register.findtext("dimIncrement"))
+            for ii, index in enumerate(_dim_indices(register, dim)[:dim]):
+                arrays.append((name % index, offset + increment * ii, size, derived, fields))
+    return singles + arrays
+
+
 def read_svd(path) -> Device:
-    from cmsis_svd.parser import SVDParser
-
-    parser = SVDParser.for_xml_file(path)
-    pdev = parser.get_device()
-    device = Device(pdev.name, compatible=pdev.description.split(","))
-
-    for peripheral in pdev.peripherals:
-        ptype = peripheral.get_derived_from()
-        if ptype is not None:
-            ptype = ptype.name
-        nper = Peripheral(peripheral.name, ptype, peripheral.base_address, parent=device)
-        for register in peripheral.registers:
-            nreg = Register(register.name, register.address_offset, register.size // 8, parent=nper)
-            for field in register.fields:
-                BitField(field.name, field.bit_offset, field.bit_width, parent=nreg)
-
-    return device
+    """
+    Streams a CMSIS-SVD file directly into the `svd.model` classes. Register
+    arrays are expanded and derived peripherals inherit the registers, base
+    address and size of their base peripheral. Reserved fields are skipped.
+
+    :param path: path to the SVD file.
+    :return: the device tree.
+    """
+    device = {}
+    peripherals = {}
+    for _, element in etree.iterparse(str(path), events=("end",), tag=("peripheral", "name", "description", "size")):
+        parent = element.getparent()
+        if element.tag != "peripheral":
+            if parent is not None and parent.tag == "device":
+                device[element.tag] = element.text
+            continue
+        name = element.findtext("name")
+        peripherals[name] = {
+            "derived": element.get("derivedFrom"),
+            "address": _int(element.findtext("baseAddress")),
+            "size": _int(element.findtext("size")),
+            "registers": _registers(element),
+        }
+        # Only the compact records are kept, not the XML elements
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del parent[0]
+
+    def _lookup(name, key):
+        # Own value or the value of the base peripheral
+        entry = peripherals[name]
+        if entry[key] is not None or entry["derived"] not in peripherals:
+            return name, entry[key]
+        return _lookup(entry["derived"], key)
+
+    device_size = _int(device.get("size"))
+    tree = Device(device.get("name"), compatible=device.get("description").split(","))
+    for name, entry in peripherals.items():
+        ptype = entry["derived"] if entry["derived"] in peripherals else None
+        nper = Peripheral(name, ptype, _lookup(name, "address")[1], parent=tree)
+        owner, registers = _lookup(name, "registers")
+        sizes = {rname: size for rname, _, size, _, _ in registers or []}
+        for rname, offset, size, derived, fields in registers or []:
+            if size is None and derived is not None:
+                if derived not in sizes:
+                    raise KeyError(f"Unable to find derived_from: {derived!r}")
+                size = sizes[derived]
+            if size is None:
+                size = _lookup(owner, "size")[1]
+            if size is None:
+                size = device_size
+            nreg = Register(rname, offset, size // 8, parent=nper)
+            for fname, position, width in fields:
+                BitField(fname, position, width, parent=nreg)
+
+    return tree
@@ -0,0 +1,83 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+"""
+Compares the memory maps of the header, CMSIS and reference manual SVD files
+of all devices and writes the differences as a JSON report.
+"""
+
+import re
+import json
+import time
+import tqdm
+import argparse
+import multiprocessing
+from pathlib import Path
+from functools import lru_cache
+from itertools import combinations
+from collections import Counter, defaultdict
+
+from modm_data.svd import read_svd, diff_memory_maps, diff_counts
+from modm_data.svd.stmicro import svd_device_files
+
+_SOURCES = ("hd", "cm", "rm")
+
+
+@lru_cache(maxsize=32)
+def _read(path: str):
+    return read_svd(path)
+
+
+def _diff(pair: tuple[str, str]) -> tuple[tuple[str, str], dict]:
+    return pair, diff_memory_maps(_read(pair[0]), _read(pair[1]))
+
+
+def _file_pairs(patterns: list[str] = None) -> dict[tuple[str, str], list[str]]:
+    # Many devices share the same files, so each pair is only compared once
+    pairs = defaultdict(list)
+    for device, files in svd_device_files().items():
+        if patterns and not any(re.match(p, device.string) for p in patterns):
+            continue
+        for left, right in combinations(_SOURCES, 2):
+            if left in files and right in files:
+                pairs[str(files[left]), str(files[right])].append(device.string)
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--device", action="append", help="Only compare devices matching this regex.")
+    parser.add_argument("--report", type=Path, default=Path("log/stmicro/svd/diff.json"))
+    parser.add_argument("--jobs", type=int, help="Number of worker processes, defaults to the CPU count.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pairs = _file_pairs(args.device)
+    results = {}
+    # Sorted pairs share their left file within a chunk and thus its cache
+    with multiprocessing.Pool(args.jobs) as pool:
+        for pair, diff in tqdm.tqdm(pool.imap_unordered(_diff, sorted(pairs), chunksize=4), total=len(pairs)):
+            results[pair] = diff
+
+    counts = Counter()
+    report = []
+    for pair in sorted(results):
+        diff_counts(results[pair], counts)
+        report.append({"left": pair[0], "right": pair[1], "devices": sorted(pairs[pair]), "diff": results[pair]})
+    summary = {
+        "pairs": len(report),
+        "identical": sum(1 for r in report if not r["diff"]),
+        "counts": {f"{level}.{kind}": count for (level, kind), count in sorted(counts.items()) if count},
+    }
+    args.report.parent.mkdir(exist_ok=True, parents=True)
+    with args.report.open("w", encoding="utf-8") as fh:
+        json.dump({"summary": summary, "pairs": report}, fh, indent=1)
+
+    print(f"{summary['pairs']} file pairs in {time.perf_counter() - start:.1f}s, {summary['identical']} identical")
+    for key, count in summary["counts"].items():
+        print(f"  {key}: {count}")
+    return True
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
@@ -3,10 +3,12 @@
 
 import re
 import json
+from bisect import bisect_left
 from pathlib import Path
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
-from ...utils import root_path, cache_path
+from ...utils import ext_path, cache_path
 from ...kg.stmicro import did_from_string
 from ...kg import DeviceIdentifier
 from ...cubemx import cubemx_device_list
@@ -14,42 +16,102 @@ from ...cubemx import cubemx_device_list
 
 _SVD_FILES = None
 _SVD_MAP_FILE = cache_path("svd_files.json")
+_SVD_MAP_VERSION = 2
+# The html2svd and header2svd outputs share the folder with the CMSIS files
+_SVD_PATH = ext_path("stmicro/svd")
+_GENERATED_PREFIXES = ("html_", "header_")
+# The CubeMX device list is derived from this file
+_FAMILIES_FILE = ext_path("stmicro/cubemx/mcu/families.xml")
+_DESCRIPTION = re.compile(rb"<description>(.*?)</description>")
+
+
+def _read_description(file: Path, size: int = 4096) -> str:
+    # The device description is at the top of the file, so only the first
+    # blocks are read until the first description is complete
+    with file.open("rb") as fh:
+        data = fh.read(size)
+        while not (match := _DESCRIPTION.search(data)):
+            if not (block := fh.read(size)):
+                raise ValueError(f"No device description found in '{file}'!")
+            data += block
+    return match.group(1).decode("utf-8")
+
+
+def _sortkey(file: Path):
+    name = re.sub(r"x+$", "", file.stem)
+    return (-len(name), name.count("x"), name.index("x") if "x" in name else 0, name)
+
+
+def _pattern(file: Path) -> str:
+    pattern = re.sub(r"x+$", "", file.stem)
+    pattern = pattern.replace("x", ".").replace("_CM", ".*?@m")
+    return pattern.replace("...A", ".....A")
+
+
+def _match_files(files: list[Path], devices: list[DeviceIdentifier]) -> dict[Path, list[DeviceIdentifier]]:
+    # Each device belongs to the most specific file matching it. The devices
+    # are sorted by name, so the candidates of a file are found by bisecting
+    # the literal prefix of its pattern instead of matching all devices.
+    devices = sorted(devices, key=lambda d: d.string.lower())
+    names = [d.string.lower() for d in devices]
+    matched = set()
+    cm_files = {}
+    for file in sorted(files, key=_sortkey):
+        pattern = _pattern(file)
+        prefix = re.match(r"[a-z0-9]*", pattern.lower()).group(0)
+        regex = re.compile(pattern, flags=re.IGNORECASE)
+        cm_files[file] = []
+        index = bisect_left(names, prefix)
+        while index < len(names) and names[index].startswith(prefix):
+            if index not in matched and regex.match(devices[index].string):
+                cm_files[file].append(devices[index])
+                matched.add(index)
+            index += 1
+    return cm_files
+
+
+def _mtimes(files: list[Path]) -> dict[str, int]:
+    return {str(f): f.stat().st_mtime_ns for f in files if f.exists()}
 
 
 def svd_file_devices() -> dict[Path, list[DeviceIdentifier]]:
-    global _SVD_FILES, _SVD_MAP_FILE
+    """
+    Finds the devices of the SVD files in `ext/stmicro/svd`: the `header_*.svd`
+    files of header2svd, the `html_*.svd` files of html2svd, and the CMSIS
+    files. The result is cached until any of the files or the CubeMX device
+    list changes.
+
+    :return: the devices of the header, CMSIS and reference manual SVD files.
+    """
+    global _SVD_FILES
     if _SVD_FILES is None:
-        if not _SVD_MAP_FILE.exists():
-            rm_files, hd_files, cm_files = {}, {}, {}
-            for file in cache_path("stmicro-svd/").glob("*.svd"):
-                match = re.search(r"<description>(.*?)</description>", file.read_text())
-                devices = [did_from_string(n) for n in match.group(1).split(",")]
-                if file.stem.startswith("rm_"):
+        files = sorted(p for p in _SVD_PATH.glob("*.svd") if p.name.startswith(_GENERATED_PREFIXES))
+        cm_paths = sorted(p for p in _SVD_PATH.rglob("*.svd") if not p.name.startswith(_GENERATED_PREFIXES))
+        mtimes = _mtimes(files + cm_paths + [_FAMILIES_FILE])
+
+        cache = None
+        if _SVD_MAP_FILE.exists():
+            with _SVD_MAP_FILE.open("r", encoding="utf-8") as fh:
+                cache = json.load(fh)
+            if cache.get("version") != _SVD_MAP_VERSION or cache.get("mtimes") != mtimes:
+                cache = None
+
+        if cache is None:
+            rm_files, hd_files = {}, {}
+            with ThreadPool() as pool:
+                descriptions = pool.map(_read_description, files)
+            for file, description in zip(files, descriptions):
+                devices = [did_from_string(n) for n in description.split(",")]
+                if file.stem.startswith("html_"):
                     rm_files[file] = devices
                 else:
                     hd_files[file] = devices
 
-            files = list(root_path("ext/cmsis/svd/data/STMicro/").glob("*.svd"))
-
-            def _sortkey(file):
-                name = re.sub(r"x+$", "", file.stem)
-                return (-len(name), name.count("x"), name.index("x") if "x" in name else 0, name)
-
-            files.sort(key=_sortkey)
-
-            def _match(file, devices):
-                pattern = re.sub(r"x+$", "", file.stem)
-                pattern = pattern.replace("x", ".").replace("_CM", ".*?@m")
-                pattern = pattern.replace("...A", ".....A")
-                return [d for d in devices if re.match(pattern, d.string, flags=re.IGNORECASE)]
-
-            mdevices = set(cubemx_device_list())
-            for file in files:
-                devices = _match(file, mdevices)
-                mdevices -= set(devices)
-                cm_files[file] = devices
+            cm_files = _match_files(cm_paths, cubemx_device_list()) if cm_paths else {}
 
             filefmt = {
+                "version": _SVD_MAP_VERSION,
+                "mtimes": mtimes,
                 "cm": {str(p): [str(d) for d in v] for p, v in cm_files.items()},
                 "hd": {str(p): [str(d) for d in v] for p, v in hd_files.items()},
                 "rm": {str(p): [str(d) for d in v] for p, v in rm_files.items()},
@@ -57,8 +119,6 @@ def svd_file_devices() -> dict[Path, list[DeviceIdentifier]]:
             with _SVD_MAP_FILE.open("w", encoding="utf-8") as fh:
                 json.dump(filefmt, fh, indent=4)
         else:
-            with _SVD_MAP_FILE.open("r", encoding="utf-8") as fh:
-                cache = json.load(fh)
             rm_files = {Path(p): [did_from_string(d) for d in v] for p, v in cache["rm"].items()}
             hd_files = {Path(p): [did_from_string(d) for d in v] for p, v in cache["hd"].items()}
             cm_files = {Path(p): [did_from_string(d) for d in v] for p, v in cache["cm"].items()}
@@ -1,8 +1,15 @@
 # Copyright 2022, Niklas Hauser
 # SPDX-License-Identifier: MPL-2.0
 
+import re
+import hashlib
+from io import BytesIO
 from lxml import etree
-from .model import Device, Peripheral, Register, BitField
+from .model import Device
+from ..utils import write_if_changed
+
+# The last decimal number of the name without leading zeros, e.g. BKP12R
+_INDEX_PATTERN = re.compile(r"^([^%]*?)(0|[1-9]\d*)(\D*)$")
 
 
 def _add_element(node, tag, text=None):
@@ -13,38 +20,62 @@ def _add_element(node, tag, text=None):
     return element
 
 
-def _format_device(xmlnode, treenode):
-    _add_element(xmlnode, "name", str(treenode.name).upper().replace("X", "x"))
-    _add_element(xmlnode, "version", "1.0")
-    descr = ",".join(d.string.upper() for d in (treenode.compatible or []))
-    _add_element(xmlnode, "description", descr)
-    _add_element(xmlnode, "addressUnitBits", "8")
-    _add_element(xmlnode, "width", "32")
-    _add_element(xmlnode, "size", "0x20")
-    _add_element(xmlnode, "resetValue", "0")
-    _add_element(xmlnode, "resetMask", "0xFFFFFFFF")
-    return _add_element(xmlnode, "peripherals")
+def _children_digest(treenode) -> bytes:
+    # Digest of the subtree without the node itself, i.e. without its name
+    digest = hashlib.blake2b(digest_size=16)
+    for child in treenode.children:
+        digest.update(child.digest)
+    return digest.digest()
 
 
-def _format_peripheral(xmlnode, treenode):
-    peripheral = _add_element(xmlnode, "peripheral")
+def _format_device(treenode):
+    device = etree.Element("device")
+    _add_element(device, "name", str(treenode.name).upper().replace("X", "x"))
+    _add_element(device, "version", "1.0")
+    descr = ",".join(d.string.upper() for d in (treenode.compatible or []))
+    _add_element(device, "description", descr)
+    _add_element(device, "addressUnitBits", "8")
+    _add_element(device, "width", "32")
+    _add_element(device, "size", "0x20")
+    _add_element(device, "resetValue", "0")
+    _add_element(device, "resetMask", "0xFFFFFFFF")
+    return list(device)
+
+
+def _format_peripheral(treenode, base=None, arrays=True):
+    peripheral = etree.Element("peripheral")
+    if base is not None:
+        # The registers are inherited from the base peripheral
+        peripheral.set("derivedFrom", base.name)
     _add_element(peripheral, "name", treenode.name)
     _add_element(peripheral, "baseAddress", hex(treenode.address))
-    if treenode.children:
-        return _add_element(peripheral, "registers")
+    if base is None and treenode.children:
+        registers = _add_element(peripheral, "registers")
+        groups = _register_groups(treenode.children) if arrays else [[r] for r in treenode.children]
+        for group in groups:
+            registers.append(_format_register(group))
+    return peripheral
+
+
+def _format_register(group):
+    treenode = group[0]
+    register = etree.Element("register")
+    if len(group) > 1:
+        increment = group[1].offset - treenode.offset
+        prefix, index, suffix = _INDEX_PATTERN.match(treenode.name).groups()
+        _add_element(register, "dim", len(group))
+        _add_element(register, "dimIncrement", hex(increment))
+        _add_element(register, "dimIndex", f"{index}-{int(index) + len(group) - 1}")
+        _add_element(register, "name", f"{prefix}%s{suffix}")
     else:
-        return peripheral
-
-
-def _format_register(xmlnode, treenode):
-    register = _add_element(xmlnode, "register")
-    _add_element(register, "name", treenode.name)
+        _add_element(register, "name", treenode.name)
     _add_element(register, "addressOffset", hex(treenode.offset))
     _add_element(register, "size", hex(treenode.width * 8))
     if treenode.children:
-        return _add_element(register, "fields")
-    else:
-        return register
+        fields = _add_element(register, "fields")
+        for child in treenode.children:
+            _format_bit_field(fields, child)
+    return register
 
 
 def _format_bit_field(xmlnode, treenode):
@@ -55,39 +86,107 @@ def _format_bit_field(xmlnode, treenode):
     return field
 
 
-def _format_svd(xmlnode, treenode):
-    current = xmlnode
-    if isinstance(treenode, Device):
-        current = _format_device(xmlnode, treenode)
-
-    elif isinstance(treenode, Peripheral):
-        current = _format_peripheral(current, treenode)
-
-    elif isinstance(treenode, Register):
-        current = _format_register(current, treenode)
-
-    elif isinstance(treenode, BitField):
-        _format_bit_field(current, treenode)
-
-    # elif isinstance(treenode, EnumeratedValue):
-    #     _format_enumerated_value(current, treenode)
-
-    for child in treenode.children:
-        _format_svd(current, child)
+def _register_groups(registers) -> list[list]:
+    # Consecutive registers with consecutive indices, a regular address
+    # increment and the same fields are written as one dim array
+    groups = []
+    for register in registers:
+        if groups and _extends_group(groups[-1], register):
+            groups[-1].append(register)
+        else:
+            groups.append([register])
+    # Readers expand the arrays after all single registers, so only arrays
+    # after the last single register keep the order of the registers
+    last = max((ii for ii, group in enumerate(groups) if len(group) == 1), default=-1)
+    return [[register] for group in groups[:last] for register in group] + groups[max(last, 0) :]
+
+
+def _extends_group(group, register) -> bool:
+    first, last = group[0], group[-1]
+    if not (fmatch := _INDEX_PATTERN.match(first.name)) or not (match := _INDEX_PATTERN.match(register.name)):
+        return False
+    prefix, index, suffix = fmatch.groups()
+    if (match.group(1), match.group(3)) != (prefix, suffix) or int(match.group(2)) != int(index) + len(group):
+        return False
+    increment = (group[1].offset - first.offset) if len(group) > 1 else (register.offset - last.offset)
+    if increment < register.width or register.offset - last.offset != increment:
+        return False
+    return register.width == first.width and _children_digest(register) == _children_digest(first)
+
+
+def _format_peripherals(treenode):
+    # Peripherals with the same registers as a previous one derive from it
+    digests = [_children_digest(peripheral) for peripheral in treenode.children]
+    bases, derived = {}, set()
+    for peripheral, digest in zip(treenode.children, digests):
+        if peripheral.children and bases.setdefault(digest, peripheral) is not peripheral:
+            derived.add(digest)
+    for peripheral, digest in zip(treenode.children, digests):
+        base = bases.get(digest)
+        if base is peripheral or not peripheral.children:
+            # cmsis-svd expands the arrays of base peripherals again for
+            # every derived peripheral, so bases do not use arrays
+            yield _format_peripheral(peripheral, arrays=digest not in derived)
+        else:
+            yield _format_peripheral(peripheral, base)
+
+
+def _write_element(xf, element, level, pretty):
+    if pretty:
+        xf.write("\n" + "  " * level)
+        etree.indent(element, level=level)
+    xf.write(element)
+
+
+def _serialize(register_tree, pretty=True) -> bytes:
+    data = BytesIO()
+    with etree.xmlfile(data, encoding="utf-8") as xf:
+        xf.write_declaration(standalone=False)
+        with xf.element("device", schemaVersion="1.1"):
+            # xmlns:xs="http://www.w3.org/2001/XMLSchema-instance"
+            # xs:noNamespaceSchemaLocation="CMSIS-SVD_Schema_1_1.xsd"
+            for element in _format_device(register_tree):
+                _write_element(xf, element, 1, pretty)
+            if pretty:
+                xf.write("\n  ")
+            with xf.element("peripherals"):
+                for peripheral in _format_peripherals(register_tree):
+                    _write_element(xf, peripheral, 2, pretty)
+                if pretty:
+                    xf.write("\n  ")
+            if pretty:
+                xf.write("\n")
+    if pretty:
+        data.write(b"\n")
+    return data.getvalue()
 
 
 def format_svd(register_tree):
-    device = etree.Element("device")
-    device.set("schemaVersion", "1.1")
-    # device.set("xmlns:xs", "http://www.w3.org/2001/XMLSchema-instance")
-    # device.set("xs:noNamespaceSchemaLocation", "CMSIS-SVD_Schema_1_1.xsd")
-
-    _format_svd(device, register_tree)
-
-    svd = etree.ElementTree(device)
-    return svd
-
-
-def write_svd(svd, path, pretty=True):
-    with open(path, "wb") as file:
-        svd.write(file, pretty_print=pretty, doctype='<?xml version="1.0" encoding="utf-8" standalone="no"?>')
+    """
+    Formats the device tree as an in-memory CMSIS-SVD document. Prefer passing
+    the device tree directly to `write_svd()`, which streams the output.
+
+    :param register_tree: the `Device` tree.
+    :return: the SVD as an lxml element tree.
+    """
+    return etree.ElementTree(etree.fromstring(_serialize(register_tree, pretty=False)))
+
+
+def write_svd(svd, path, pretty=True) -> bool:
+    """
+    Writes a CMSIS-SVD file unless its content is unchanged. Device trees are
+    streamed peripheral by peripheral with `derivedFrom` for peripherals with
+    the same registers as a previous one and `dim` arrays for regular
+    register sequences.
+
+    :param svd: the `Device` tree or an lxml element tree from `format_svd()`.
+    :param path: path of the SVD file.
+    :param pretty: indent the XML elements.
+    :return: `True` if the file was written.
+    """
+    if isinstance(svd, Device):
+        data = _serialize(svd, pretty)
+    else:
+        doctype = '<?xml version="1.0" encoding="utf-8" standalone="no"?>'
+        data = etree.tostring(svd, pretty_print=pretty, doctype=doctype)
+    return write_if_changed(path, data)
@@ -6,6 +6,9 @@ from .helper import list_lstrip, list_rstrip, list_strip, pkg_file_exists, pkg_a
 from .anytree import ReversePreOrderIter
 from .path import root_path, ext_path, cache_path, patch_path
 from .xml import XmlReader
+from .cache import load_pickle, store_pickle
+from .output import WRITES, write_if_changed, format_writes, parse_writes
+from .compression import compression_of, uncompressed_path, read_compressed, write_compressed, train_dictionary
 
 __all__ = [
     "Point",
@@ -26,4 +29,15 @@ __all__ = [
     "cache_path",
     "patch_path",
     "XmlReader",
+    "load_pickle",
+    "store_pickle",
+    "WRITES",
+    "write_if_changed",
+    "format_writes",
+    "parse_writes",
+    "compression_of",
+    "uncompressed_path",
+    "read_compressed",
+    "write_compressed",
+    "train_dictionary",
 ]
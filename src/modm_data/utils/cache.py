@@ -0,0 +1,55 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+import os
+import pickle
+import logging
+import tempfile
+from pathlib import Path
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def load_pickle(path: Path, key) -> object | None:
+    """
+    Loads a value stored with `store_pickle()` if its key matches.
+
+    :param path: path of the cache file.
+    :param key: the expected key of the value.
+    :return: the cached value or `None` if missing, stale or invalid.
+    """
+    try:
+        with Path(path).open("rb") as file:
+            # Only unpickle the value if the key still matches
+            if pickle.load(file) == key:
+                return pickle.load(file)
+    except FileNotFoundError:
+        pass
+    except Exception as error:
+        _LOGGER.debug(f"Ignoring invalid cache '{path}': {error}")
+    return None
+
+
+def store_pickle(path: Path, key, value):
+    """
+    Stores a value together with its key. The file is replaced atomically,
+    since several processes may write the same cache.
+
+    :param path: path of the cache file.
+    :param key: the key identifying the value, for example file stamps and versions.
+    :param value: the value to store.
+    """
+    path = Path(path)
+    temporary = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as file:
+            temporary = Path(file.name)
+            pickle.dump(key, file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except Exception as error:
+        _LOGGER.debug(f"Cannot write cache '{path}': {error}")
+        # Do not leave partially written files behind
+        if temporary is not None:
+            temporary.unlink(missing_ok=True)
@@ -0,0 +1,136 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+import gzip
+import logging
+from pathlib import Path
+from functools import lru_cache
+from .output import write_if_changed
+
+_LOGGER = logging.getLogger(__name__)
+
+COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+"""File suffix of each supported compression."""
+
+DICTIONARY_NAME = "zstd.dict"
+"""File name of a shared zstd dictionary next to the compressed files or in their parent folder."""
+
+
+def compression_of(path: Path) -> str | None:
+    """
+    :param path: path of a file.
+    :return: the compression of the file based on its suffix or `None`.
+    """
+    suffix = Path(path).suffix
+    return next((name for name, csuffix in COMPRESSIONS.items() if csuffix == suffix), None)
+
+
+def uncompressed_path(path: Path) -> Path:
+    """
+    :param path: path of a possibly compressed file.
+    :return: the path without the compression suffix.
+    """
+    path = Path(path)
+    return path.with_suffix("") if compression_of(path) else path
+
+
+@lru_cache(maxsize=8)
+def _zstd_dictionary(path: Path, mtime: int):
+    import zstandard
+
+    return zstandard.ZstdCompressionDict(path.read_bytes())
+
+
+def _find_dictionary(path: Path, dict_id: int):
+    for folder in (path.parent, path.parent.parent):
+        if (dpath := folder / DICTIONARY_NAME).exists():
+            dictionary = _zstd_dictionary(dpath, dpath.stat().st_mtime_ns)
+            if dictionary.dict_id() == dict_id:
+                return dictionary
+    raise FileNotFoundError(f"Cannot find zstd dictionary {dict_id} for '{path}'!")
+
+
+def _install_dictionary(dictionary: Path, path: Path) -> Path:
+    # Only dictionaries named DICTIONARY_NAME next to the file or in its
+    # parent folder are found when reading, so others are copied there
+    folders = (path.parent.resolve(), path.parent.parent.resolve())
+    if dictionary.name == DICTIONARY_NAME and dictionary.resolve().parent in folders:
+        return dictionary
+    target = path.parent / DICTIONARY_NAME
+    data = dictionary.read_bytes()
+    if not target.exists() or target.read_bytes() != data:
+        _LOGGER.info(f"Copying zstd dictionary '{dictionary}' to '{target}'")
+        target.write_bytes(data)
+    return target
+
+
+def read_compressed(path: Path) -> bytes:
+    """
+    Reads a plain, gzip or zstd compressed file depending on its suffix. Files
+    compressed with a dictionary find it via `DICTIONARY_NAME`.
+
+    :param path: path of the file.
+    :return: the uncompressed content.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    compression = compression_of(path)
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "zstd":
+        import zstandard
+
+        dictionary = None
+        if dict_id := zstandard.get_frame_parameters(data).dict_id:
+            dictionary = _find_dictionary(path, dict_id)
+        # Streamed frames do not store their content size
+        with zstandard.ZstdDecompressor(dict_data=dictionary).stream_reader(data) as reader:
+            return reader.read()
+    return data
+
+
+def write_compressed(path: Path, data: bytes, dictionary: Path = None, level: int = None) -> bool:
+    """
+    Writes a plain, gzip or zstd compressed file depending on its suffix
+    unless its content is unchanged.
+
+    :param path: path of the file.
+    :param data: the uncompressed content.
+    :param dictionary: path to a zstd dictionary trained with `train_dictionary()`,
+                       which is copied next to the file unless it can be found.
+    :param level: compression level, defaults to 9 for gzip and 19 for zstd.
+    :return: `True` if the file was written.
+    """
+    path = Path(path)
+    compression = compression_of(path)
+    if compression == "gzip":
+        # Without the mtime the output is reproducible
+        data = gzip.compress(data, compresslevel=level or 9, mtime=0)
+    elif compression == "zstd":
+        import zstandard
+
+        if dictionary is not None:
+            dictionary = _install_dictionary(Path(dictionary), path)
+            dictionary = _zstd_dictionary(dictionary, dictionary.stat().st_mtime_ns)
+        data = zstandard.ZstdCompressor(level=level or 19, dict_data=dictionary).compress(data)
+    return write_if_changed(path, data)
+
+
+def train_dictionary(paths: list[Path], path: Path, size: int = 112640) -> Path:
+    """
+    Trains a zstd dictionary on samples of similar files, which greatly
+    improves the compression of many small files.
+
+    :param paths: paths of the (possibly compressed) sample files.
+    :param path: path of the dictionary file, usually named `DICTIONARY_NAME`.
+    :param size: maximum size of the dictionary in bytes.
+    :return: path of the dictionary file.
+    """
+    import zstandard
+
+    samples = [read_compressed(p) for p in paths]
+    _LOGGER.info(f"Training zstd dictionary on {len(samples)} files")
+    dictionary = zstandard.train_dictionary(size, samples)
+    path = Path(path)
+    path.write_bytes(dictionary.as_bytes())
+    return path
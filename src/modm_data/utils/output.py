@@ -0,0 +1,57 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+import re
+import hashlib
+from pathlib import Path
+from collections import Counter
+
+WRITES = Counter()
+"""Number of `written` and `unchanged` output files of this process."""
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=32).digest()
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """
+    Writes the file only if its content changed, which keeps the mtimes of
+    unchanged outputs for Make and avoids needless disk I/O.
+
+    :param path: path of the output file.
+    :param data: the serialized output.
+    :return: `True` if the file was written.
+    """
+    path = Path(path)
+    try:
+        # Only files of the same size need to be hashed
+        if path.stat().st_size == len(data) and _digest(path.read_bytes()) == _digest(data):
+            WRITES["unchanged"] += 1
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(data)
+    WRITES["written"] += 1
+    return True
+
+
+def format_writes(writes: Counter = None) -> str:
+    """
+    :param writes: counts of a part of the run, e.g. `WRITES - start`, defaults to `WRITES`.
+    :return: a summary of the written and unchanged files.
+    """
+    writes = WRITES if writes is None else writes
+    return f"{writes['written']} files written, {writes['unchanged']} unchanged"
+
+
+def parse_writes(text: str) -> Counter:
+    """
+    :param text: output of other processes containing `format_writes()` summaries.
+    :return: the sum of all summaries in the text.
+    """
+    writes = Counter()
+    for written, unchanged in re.findall(r"(\d+) files written, (\d+) unchanged", text):
+        writes["written"] += int(written)
+        writes["unchanged"] += int(unchanged)
+    return writes
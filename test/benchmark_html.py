@@ -0,0 +1,154 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+"""
+Benchmark the pdf2html conversion of the regression test documents.
+
+The documents and page ranges are taken from `test/convert_html.sh`. Every case
+is converted in a fresh process to measure the pages/second, the time spent in
+each conversion stage and the peak RSS. The HTML output is compared against the
+golden output in `test/data/html` and the results are appended to a history
+file. A case is flagged if its output changed or its throughput dropped by more
+than the threshold compared to the last run in the history.
+"""
+
+import io
+import sys
+import json
+import time
+import shlex
+import difflib
+import argparse
+import resource
+import subprocess
+import contextlib
+import multiprocessing
+from pathlib import Path
+from datetime import datetime, timezone
+
+ROOT = Path(__file__).parents[1]
+SCRIPT = ROOT / "test/convert_html.sh"
+
+
+def _parse_cases(script: Path) -> list[dict]:
+    cases = []
+    # Join the shell line continuations first
+    for line in script.read_text().replace("\\\n", " ").splitlines():
+        args = shlex.split(line, comments=True)
+        if "modm_data.pdf2html.stmicro" not in args:
+            continue
+        pages = []
+        for opt, value in zip(args, args[1:]):
+            if opt == "--page":
+                pages.append(int(value) - 1)
+            elif opt == "--range":
+                start, stop = value.split(":")
+                pages.extend(p - 1 for p in range(int(start), int(stop) + 1))
+        document = ROOT / args[args.index("--document") + 1]
+        golden = ROOT / args[args.index("--output") + 1]
+        cases.append({"name": document.stem, "document": document, "golden": golden, "pages": sorted(pages)})
+    return cases
+
+
+def _convert(case: dict, output: Path) -> dict:
+    from modm_data.pdf2html import convert, stmicro
+
+    timings = {}
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        doc = stmicro.Document(case["document"])
+        timings["open"] = time.perf_counter() - start
+        convert(doc, case["pages"], output, render_html=True, timings=timings)
+    duration = time.perf_counter() - start
+    return {
+        "pages": len(case["pages"]),
+        "seconds": duration,
+        "pages_per_second": len(case["pages"]) / duration,
+        "stages": timings,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _diff(golden: Path, output: Path) -> list[str]:
+    expected = golden.read_text().splitlines(keepends=True) if golden.exists() else []
+    actual = output.read_text().splitlines(keepends=True) if output.exists() else []
+    return list(difflib.unified_diff(expected, actual, str(golden), str(output)))
+
+
+def _git_revision() -> str:
+    result = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True, text=True)
+    return result.stdout.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output", type=Path, default=ROOT / "log/benchmark/html")
+    parser.add_argument("--history", type=Path, default=ROOT / "log/benchmark/html.jsonl")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Relative throughput drop to flag.")
+    parser.add_argument("--case", action="append", help="Only run the cases with this document name.")
+    parser.add_argument("--diff", action="store_true", help="Print the differences to the golden output.")
+    args = parser.parse_args()
+
+    cases = [c for c in _parse_cases(SCRIPT) if not args.case or c["name"] in args.case]
+    args.output.mkdir(parents=True, exist_ok=True)
+
+    history = []
+    if args.history.exists():
+        history = [json.loads(line) for line in args.history.read_text().splitlines() if line.strip()]
+    previous = history[-1]["cases"] if history else {}
+
+    results = {}
+    flagged = []
+    # Every case runs in a fresh process to get a clean peak RSS and cold caches
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        output = args.output / case["golden"].name
+        with context.Pool(1) as pool:
+            result = pool.apply(_convert, (case, output))
+        diff = _diff(case["golden"], output)
+        result["changed"] = bool(diff)
+        results[case["name"]] = result
+
+        reasons = []
+        if diff:
+            reasons.append(f"output changed ({len(diff)} diff lines)")
+            if args.diff:
+                sys.stdout.writelines(diff)
+        if (last := previous.get(case["name"])) is not None:
+            ratio = result["pages_per_second"] / last["pages_per_second"]
+            if ratio < 1 - args.threshold:
+                reasons.append(f"throughput dropped to {ratio:.0%}")
+        if reasons:
+            flagged.append(case["name"])
+
+        stages = " ".join(f"{k}={v:.2f}s" for k, v in result["stages"].items())
+        status = "FLAG " + ", ".join(reasons) if reasons else "ok"
+        print(
+            f"{case['name']:>14}: {result['pages']:2} pages {result['pages_per_second']:5.2f} p/s "
+            f"{result['peak_rss_mb']:6.0f} MB | {stages} | {status}",
+            flush=True,
+        )
+
+    total_pages = sum(r["pages"] for r in results.values())
+    total_seconds = sum(r["seconds"] for r in results.values())
+    if total_seconds:
+        print(f"Total: {total_pages} pages in {total_seconds:.1f}s = {total_pages / total_seconds:.2f} p/s")
+
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    with args.history.open("a") as history_file:
+        entry = {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "flagged": flagged,
+            "cases": results,
+        }
+        history_file.write(json.dumps(entry) + "\n")
+
+    if flagged:
+        print(f"Flagged: {', '.join(flagged)}")
+    return not flagged
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
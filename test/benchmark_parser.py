@@ -0,0 +1,75 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+"""
+Benchmark the lxml-based `FastParser` against the pure-Python `Parser` of
+`modm_data.html` on all plain and compressed chapters of the HTML archive and
+check that both produce the same items.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from modm_data.html.parser import Parser, FastParser
+from modm_data.html import Table
+from modm_data.html.chapter import chapter_paths
+from modm_data.utils import read_compressed
+
+ROOT = Path(__file__).parents[1]
+
+
+def _summary(items: list) -> list:
+    summary = []
+    for item in items:
+        if isinstance(item, Table):
+            cells = [(c.positions, c.span, c._head, c.html) for c in item._cells]
+            summary.append((Table, item.heading(), item.caption(), item.size, item._hrows, cells))
+        else:
+            summary.append((type(item), item.html))
+    return summary
+
+
+def _parse(parser_class, data: bytes) -> tuple[float, list]:
+    start = time.perf_counter()
+    parser = parser_class()
+    parser.feed(data if parser_class is FastParser else data.decode("utf-8"))
+    return time.perf_counter() - start, parser._items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--archive", type=Path, default=ROOT / "ext/stmicro/html-archive")
+    parser.add_argument("--document", action="append", help="Only parse chapters of this document name.")
+    args = parser.parse_args()
+
+    paths = chapter_paths(args.archive, "**/*")
+    if args.document:
+        paths = [p for p in paths if any(d in p.parent.name for d in args.document)]
+
+    slow_total, fast_total, size_total = 0, 0, 0
+    mismatches = []
+    for path in paths:
+        data = read_compressed(path)
+        slow, slow_items = _parse(Parser, data)
+        fast, fast_items = _parse(FastParser, data)
+        slow_total += slow
+        fast_total += fast
+        size_total += len(data)
+        if _summary(slow_items) != _summary(fast_items):
+            mismatches.append(path)
+            print(f"Mismatch: {path}", flush=True)
+
+    if not paths:
+        print(f"No HTML files found in '{args.archive}'!")
+        return False
+    megabytes = size_total / 1e6
+    print(f"{len(paths)} files, {megabytes:.1f} MB")
+    print(f"Parser:     {slow_total:6.2f}s = {megabytes / slow_total:6.2f} MB/s")
+    print(f"FastParser: {fast_total:6.2f}s = {megabytes / fast_total:6.2f} MB/s ({slow_total / fast_total:.1f}x)")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
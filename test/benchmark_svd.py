@@ -0,0 +1,87 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+"""
+Benchmark the lxml-based `read_svd` of `modm_data.svd` against the reader
+built on the `cmsis-svd` package on all CMSIS-SVD files in a folder and its
+subfolders and check that both produce the same device trees.
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+from modm_data.svd import Device, Peripheral, Register, BitField, read_svd
+
+ROOT = Path(__file__).parents[1]
+
+
+def _read_cmsis_svd(path) -> Device:
+    # The previous implementation of read_svd
+    from cmsis_svd.parser import SVDParser
+
+    parser = SVDParser.for_xml_file(path)
+    pdev = parser.get_device()
+    device = Device(pdev.name, compatible=pdev.description.split(","))
+
+    for peripheral in pdev.peripherals:
+        ptype = peripheral.get_derived_from()
+        if ptype is not None:
+            ptype = ptype.name
+        nper = Peripheral(peripheral.name, ptype, peripheral.base_address, parent=device)
+        for register in peripheral.registers:
+            nreg = Register(register.name, register.address_offset, register.size // 8, parent=nper)
+            for field in register.fields:
+                BitField(field.name, field.bit_offset, field.bit_width, parent=nreg)
+
+    return device
+
+
+def _summary(device: Device) -> list:
+    summary = [(device.name, device.compatible)]
+    for peripheral in device.children:
+        summary.append((peripheral.name, peripheral.type, peripheral.address))
+        for register in peripheral.children:
+            fields = [(f.name, f.position, f.width) for f in register.children]
+            summary.append((register.name, register.offset, register.width, fields))
+    return summary
+
+
+def _read(reader, path: Path) -> tuple[float, Device]:
+    start = time.perf_counter()
+    device = reader(path)
+    return time.perf_counter() - start, device
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--path", type=Path, default=ROOT / "ext/stmicro/svd")
+    args = parser.parse_args()
+
+    paths = sorted(args.path.rglob("*.svd"))
+    if not paths:
+        print(f"No SVD files found in '{args.path}'!")
+        return False
+
+    slow_total, fast_total, size_total = 0, 0, 0
+    mismatches = []
+    for path in paths:
+        slow, slow_device = _read(_read_cmsis_svd, path)
+        fast, fast_device = _read(read_svd, path)
+        slow_total += slow
+        fast_total += fast
+        size_total += path.stat().st_size
+        if _summary(slow_device) != _summary(fast_device):
+            mismatches.append(path)
+            print(f"Mismatch: {path}", flush=True)
+
+    megabytes = size_total / 1e6
+    print(f"{len(paths)} files, {megabytes:.1f} MB")
+    print(f"cmsis-svd: {slow_total:6.2f}s = {megabytes / slow_total:6.2f} MB/s")
+    print(f"read_svd:  {fast_total:6.2f}s = {megabytes / fast_total:6.2f} MB/s ({slow_total / fast_total:.1f}x)")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
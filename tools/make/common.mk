@@ -77,3 +77,20 @@ run-regression-tests: ext/test/regression/
 	@test/convert_html.sh
 	@git diff --exit-code -- test/data/html
 
+
+.PHONY: run-regression-benchmark
+## @Tests Benchmark the regression conversion and compare it to the last run in log/benchmark/html.jsonl.
+run-regression-benchmark: ext/test/regression/
+	@python3 test/benchmark_html.py
+
+
+.PHONY: run-parser-benchmark
+## @Tests Benchmark the lxml against the pure-Python parser on the HTML archive.
+run-parser-benchmark: ext/stmicro/html-archive/
+	@python3 test/benchmark_parser.py
+
+
+.PHONY: run-svd-benchmark
+## @Tests Benchmark the lxml against the cmsis-svd reader on the CMSIS-SVD files.
+run-svd-benchmark: ext/stmicro/svd/
+	@python3 test/benchmark_svd.py
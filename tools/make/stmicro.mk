@@ -219,3 +219,11 @@ convert-stmicro-header-svd: log/stmicro/svd/ ext/stmicro/header/ ext/arm/cmsis/
 ## Remove all STMicro SVD files in the archive.
 clean-stmicro-header-svd:
 	@rm -f $(wildcard ext/stmicro/svd-archive/header_*.svd)
+
+
+# ============================ Comparing SVD Files ============================
+.PHONY: diff-stmicro-svd
+## Compare the header, CMSIS and reference manual SVD files of all devices
+## and write the differences to log/stmicro/svd/diff.json.
+diff-stmicro-svd: log/stmicro/svd/ ext/stmicro/svd/
+	@python3 -m modm_data.svd.stmicro
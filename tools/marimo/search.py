@@ -31,24 +31,32 @@ def __(__file__, filter_chapter, filter_document, filter_table, mo):
     import re
     from pathlib import Path
     import pandas as pd
+    from modm_data.html import Index
+    from modm_data.utils import read_compressed
 
 
     _doc_path = (Path(__file__).parents[2] / "ext/stmicro/html-archive").absolute()
+    _index = Index(_doc_path)
+    _index.update(filter_document.value)
     _output = "Tables:  \n"
     _count = 0
-    for _document in _doc_path.glob(filter_document.value):
-        _output += f"## [{_document.stem}](file://{_document})\n"
-        for _chapter in _document.glob("*html"):
-            _chapter_name = _chapter.stem.replace("_", " ")
-            if re.search(filter_chapter.value, _chapter_name, re.IGNORECASE):
-                _output += f"### [{_chapter_name}](file://{_chapter})\n"
-                _html = lxml.html.parse(_chapter)
-                for _caption in _html.xpath("//table/caption"):
-                    if re.search(filter_table.value, _caption.text_content(), re.IGNORECASE):
-                        _table = _caption.getparent()
-                        _html = lxml.etree.tostring(_table).decode('utf-8')
-                        _output += _html + "\n"
-                        _count += 1
+    _document = None
+    _chapters = {}
+    # Only parse the chapters that contain matching tables
+    for _match in _index.tables(filter_document.value, filter_chapter.value, filter_table.value):
+        _chapters.setdefault(_match.path, (_match.document, _match.chapter))
+    for _chapter, (_document_name, _chapter_name) in _chapters.items():
+        if _document != _document_name:
+            _document = _document_name
+            _output += f"## [{_document}](file://{_chapter.parent})\n"
+        _output += f"### [{_chapter_name}](file://{_chapter})\n"
+        _html = lxml.html.fromstring(read_compressed(_chapter))
+        for _caption in _html.xpath("//table/caption"):
+            if re.search(filter_table.value, _caption.text_content(), re.IGNORECASE):
+                _table = _caption.getparent()
+                _html = lxml.etree.tostring(_table).decode('utf-8')
+                _output += _html + "\n"
+                _count += 1
     _output = f"{_count} " + _output
     mo.md(_output)
     return Path, lxml, pd, re
@@ -0,0 +1,45 @@
+# Copyright 2026, Niklas Hauser
+# SPDX-License-Identifier: MPL-2.0
+
+"""
+Compresses the plain chapter files of an HTML archive in place, optionally
+with a zstd dictionary trained on the archive itself, which modm_data.html
+then reads transparently.
+"""
+
+import sys
+import random
+import argparse
+from pathlib import Path
+
+sys.path.append(".")
+
+from modm_data.pdf2html import compress
+from modm_data.utils import train_dictionary
+from modm_data.utils.compression import DICTIONARY_NAME
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--archive", type=Path, default=Path("ext/stmicro/html-archive"))
+    parser.add_argument("--compress", choices=["gzip", "zstd"], default="zstd")
+    parser.add_argument("--dictionary", action="store_true", help="Train a zstd dictionary on the archive.")
+    parser.add_argument("--samples", type=int, default=2000, help="Number of chapters to train the dictionary on.")
+    args = parser.parse_args()
+
+    folders = sorted(p for p in args.archive.iterdir() if p.is_dir())
+    dictionary = None
+    if args.dictionary:
+        paths = sorted(args.archive.glob("*/*.html"))
+        paths = random.Random(0).sample(paths, min(args.samples, len(paths)))
+        dictionary = train_dictionary(paths, args.archive / DICTIONARY_NAME)
+
+    for folder in folders:
+        print(folder)
+        compress(folder, args.compress, dictionary)
+
+    return True
+
+
+if __name__ == "__main__":
+    exit(0 if main() else 1)
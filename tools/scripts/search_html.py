@@ -9,7 +9,7 @@ from lxml import etree
 from pathlib import Path
 sys.path.append(".")
 
-from modm_data.html import Document
+from modm_data.html import Document, Chapter, Index
 
 def _format_html(xmlnode, treenode):
     current = xmlnode
@@ -100,28 +100,32 @@ def format_document(document):
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--document", type=str)
+    parser.add_argument("--document", type=str, default="*")
     parser.add_argument("--chapter", type=str)
     parser.add_argument("--table", type=str)
     parser.add_argument("--html", type=str)
     args = parser.parse_args()
 
-    documents = (Path(__file__).parents[2] / "ext/stmicro/html-archive").absolute()
-    documents = [Document(d) for d in documents.glob(args.document)]
+    archive = (Path(__file__).parents[2] / "ext/stmicro/html-archive").absolute()
+    index = Index(archive)
+    index.update(args.document)
 
     rootnode = anytree.Node("root", document=args.document, chapter=args.chapter, table=args.table)
 
-    for document in documents:
-        print()
-        print(document, document.relpath)
-        docnode = anytree.Node("document", parent=rootnode, obj=document)
-        for chapter in document.chapters(args.chapter):
-            if tables := chapter.tables(args.table):
-                print(chapter)
-                chanode = anytree.Node("chapter", parent=docnode, obj=chapter)
-                for table in tables:
-                    print(table, table.caption())
-                    anytree.Node("table", parent=chanode, obj=table)
+    docnodes, chanodes = {}, {}
+    for match in index.tables(args.document, args.chapter, args.table):
+        if (docnode := docnodes.get(match.document)) is None:
+            document = Document(archive / match.document)
+            print()
+            print(document, document.relpath)
+            docnode = docnodes[match.document] = anytree.Node("document", parent=rootnode, obj=document)
+        if (chanode := chanodes.get(match.path)) is None:
+            chapter = Chapter(match.path)
+            print(chapter)
+            chanode = chanodes[match.path] = anytree.Node("chapter", parent=docnode, obj=chapter)
+        table = index.table(match)
+        print(table, table.caption())
+        anytree.Node("table", parent=chanode, obj=table)
 
     html = format_document(rootnode)
     with open(Path(args.html), "wb") as f: